@@ -1,4 +1,4 @@
-import React, { useCallback, useEffect, useMemo, useState } from "react";
+import React, { useCallback, useEffect, useMemo, useRef, useState } from "react";
 import { useAtom } from "jotai";
 import { useToast } from "@chakra-ui/react";
 import { StatusesComponent } from "../components/StatusComponent";
@@ -25,6 +25,7 @@ type BackendUser = {
   status: DbStatus | null;
 };
 type BackendUsersList = { users: BackendUser[] };
+type BackendStatusEvent = { user_id: number; status: DbStatus | null; updated_at: string | null };
 
 const mapUser = (u: BackendUser): UserRow => ({
   id: u.id,
@@ -71,7 +72,7 @@ export const StatusesContainer: React.FC<{
       try {
         const res = await fetchOnceWithOneRetry(
           `${ENV.API_URL}/users/list_users_with_statuses?user_id=${currentUserId}`,
-          { credentials: "include", cache: "no-store", signal }
+          { credentials: "include", cache: "no-cache", signal } // revalidate via ETag → 304
         );
 
         if (!res.ok) {
@@ -104,7 +105,42 @@ export const StatusesContainer: React.FC<{
     [onLogout, currentUserId, usersRaw.length, setUsersRaw, setMeStatusDb, setIsLoading, setLastUpdated, toast]
   );
 
-  // initial load (foreground) + polling every 3 minutes (background)
+  // latest fetchAllUsers for the long-lived event stream (avoids reconnecting on every render)
+  const fetchAllUsersRef = useRef(fetchAllUsers);
+  fetchAllUsersRef.current = fetchAllUsers;
+  // true while the live stream is connected; polling is skipped meanwhile
+  const streamOpenRef = useRef(false);
+
+  // live status changes (Server-Sent Events); the browser reconnects by itself on errors
+  useEffect(() => {
+    if (typeof EventSource === "undefined") return;
+    const es = new EventSource(`${ENV.API_URL}/user_statuses/stream`, { withCredentials: true });
+
+    es.onopen = () => {
+      streamOpenRef.current = true;
+    };
+    es.onerror = () => {
+      streamOpenRef.current = false;
+    };
+    es.addEventListener("status", (e) => {
+      const ev: BackendStatusEvent = JSON.parse((e as MessageEvent).data);
+      const next = (ev.status ?? "working") as DbStatus;
+      setUsersRaw((prevUsers) => prevUsers.map((u) => (u.id === ev.user_id ? { ...u, status: next } : u)));
+      if (ev.user_id === currentUserId) setMeStatusDb(next);
+      setLastUpdated(new Date());
+    });
+    // server dropped events for us (reconnect / slow consumer) → reload once
+    es.addEventListener("resync", () => {
+      fetchAllUsersRef.current({ foreground: false });
+    });
+
+    return () => {
+      streamOpenRef.current = false;
+      es.close();
+    };
+  }, [currentUserId, setUsersRaw, setMeStatusDb, setLastUpdated]);
+
+  // initial load (foreground) + polling every 3 minutes (background, only while the stream is down)
   useEffect(() => {
     let cancelled = false;
     const ctrl = new AbortController();
@@ -116,7 +152,7 @@ export const StatusesContainer: React.FC<{
     })();
 
     const id = window.setInterval(() => {
-      if (cancelled) return;
+      if (cancelled || streamOpenRef.current) return;
       const c = new AbortController();
       fetchAllUsers({ signal: c.signal, foreground: false });
     }, ENV.POLL_MS);
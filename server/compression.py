@@ -0,0 +1,175 @@
+"""
+Response compression (gzip, and brotli when the `brotli` package is installed).
+
+- CompressionMiddleware: pure ASGI; compresses complete (non-streaming) bodies of textual
+  responses above COMPRESSION_MIN_BYTES. Responses that already carry Content-Encoding
+  (e.g. the pre-compressed roster) and event streams pass through untouched.
+- BodyCache / roster_body_cache: the roster route caches its final bytes per
+  (ETag, query, encoding), so an unchanged roster is serialized and compressed once per
+  version instead of once per request.
+"""
+from __future__ import annotations
+import gzip
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+COMPRESSION_ENABLED = (os.getenv("COMPRESSION_ENABLED") or "true").strip().lower() in {"1", "true", "yes", "on"}
+MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+ROSTER_BODY_CACHE_MAX_BYTES = int(os.getenv("ROSTER_BODY_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# per-request compression favours speed; cached bodies are compressed once, so squeeze harder
+_GZIP_LEVEL, _GZIP_LEVEL_CACHED = 5, 9
+_BROTLI_QUALITY, _BROTLI_QUALITY_CACHED = 4, 9
+# bodies above this are compressed in the thread pool, off the event loop
+_THREAD_MIN_BYTES = 64 * 1024
+
+_COMPRESSIBLE = ("application/json", "text/", "application/javascript", "application/xml", "image/svg+xml")
+
+
+# <------------------ NEGOTIATION / CODECS -------------------->
+def negotiate(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick 'br' or 'gzip' from an Accept-Encoding header (q=0 excluded); None = identity."""
+    if not accept_encoding or not COMPRESSION_ENABLED:
+        return None
+    offered = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        offered[name.strip().lower()] = q
+    if brotli is not None and offered.get("br", 0) > 0:
+        return "br"
+    if offered.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str, cached: bool = False) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=_BROTLI_QUALITY_CACHED if cached else _BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=_GZIP_LEVEL_CACHED if cached else _GZIP_LEVEL, mtime=0)
+
+
+async def encode_body(body: bytes, encoding: Optional[str], cached: bool = False) -> Tuple[bytes, Optional[str]]:
+    """(bytes to send, Content-Encoding or None). Small bodies stay identity."""
+    if encoding is None or len(body) < MIN_BYTES:
+        return body, None
+    if len(body) >= _THREAD_MIN_BYTES:
+        return await run_in_threadpool(compress, body, encoding, cached), encoding
+    return compress(body, encoding, cached), encoding
+
+
+def _compressible(content_type: str) -> bool:
+    return content_type.startswith(_COMPRESSIBLE) and not content_type.startswith("text/event-stream")
+
+
+# <------------------ MIDDLEWARE -------------------->
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int = MIN_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            return await self.app(scope, receive, send)
+
+        start: Optional[dict] = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start, passthrough
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if "content-encoding" in headers or not _compressible(headers.get("content-type", "")):
+                    passthrough = True
+                    await send(message)
+                else:
+                    start = message  # hold headers until we see the body
+                return
+            if passthrough or message["type"] != "http.response.body" or start is None:
+                await send(message)
+                return
+
+            held, start = start, None
+            body = message.get("body", b"")
+            if message.get("more_body", False) or len(body) < self.minimum_size:
+                # streaming or small: send as is
+                await send(held)
+                await send(message)
+                return
+            compressed, _ = await encode_body(body, encoding)
+            headers = MutableHeaders(raw=held["headers"])
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+            await send(held)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
+
+
+# <------------------ ROSTER BODY CACHE -------------------->
+class BodyCache:
+    """Byte-bounded LRU of ready-to-send response bodies."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._data: "OrderedDict[Hashable, Tuple[bytes, Optional[str]]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Tuple[bytes, Optional[str]]]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item
+
+    def set(self, key: Hashable, item: Tuple[bytes, Optional[str]]) -> None:
+        size = len(item[0])
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old[0])
+            self._data[key] = item
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._data.popitem(last=False)
+                self._bytes -= len(evicted[0])
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"entries": len(self._data), "bytes": self._bytes, "hits": self.hits, "misses": self.misses}
+
+
+roster_body_cache = BodyCache(ROSTER_BODY_CACHE_MAX_BYTES)
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import os
+from datetime import datetime
+from typing import AsyncIterator, Optional, Sequence
+
+from sqlalchemy import Select, select
+from sqlalchemy.engine import Row
+from starlette.concurrency import run_in_threadpool
+
+from server.models.user_model import User
+from server.models.user_status_model import UserStatus
+from server.models.user_status_history_model import UserStatusHistory
+from server.crud.user_status_history_crud import _as_utc
+
+# rows fetched per server-side cursor round-trip (and per chunk written to the client)
+EXPORT_BATCH_ROWS = int(os.getenv("EXPORT_BATCH_ROWS", "2000"))
+
+USER_COLUMNS = ("id", "email", "first_name", "last_name", "status", "status_updated_at")
+HISTORY_COLUMNS = ("id", "user_id", "status", "previous_status", "changed_at")
+
+
+# <------------------ STATEMENTS -------------------->
+def users_with_statuses_stmt(status: Optional[str] = None) -> Select:
+    """Whole roster in id order (users PK scan; no sort over the join)."""
+    stmt = (
+        select(
+            User.id, User.email, User.first_name, User.last_name,
+            UserStatus.status, UserStatus.updated_at.label("status_updated_at"),
+        )
+        .select_from(User)
+        .outerjoin(UserStatus, UserStatus.user_id == User.id)
+        .order_by(User.id)
+    )
+    if status is not None:
+        stmt = stmt.where(UserStatus.status == status)
+    return stmt
+
+
+def status_history_stmt(start: datetime, end: datetime) -> Select:
+    """History rows with start <= changed_at < end, oldest first (partition pruning on changed_at)."""
+    H = UserStatusHistory
+    return (
+        select(H.id, H.user_id, H.status, H.previous_status, H.changed_at)
+        .where(H.changed_at >= _as_utc(start), H.changed_at < _as_utc(end))
+        .order_by(H.changed_at, H.id)
+    )
+
+
+# <------------------ STREAM -------------------->
+async def stream_partitions(stmt: Select, batch_rows: int = EXPORT_BATCH_ROWS) -> AsyncIterator[Sequence[Row]]:
+    """
+    Yield `stmt`'s rows in lists of `batch_rows` from a server-side cursor (yield_per), in a
+    session of its own (a replica when one is usable), so memory stays flat whatever the
+    row count. The session is closed when the generator finishes or the client disconnects.
+    """
+    from server.sql_db.db import DB_ASYNC, AsyncSessionLocal, SessionLocal
+    from server.sql_db.replicas import pick_replica
+
+    replica = pick_replica()
+    stmt = stmt.execution_options(yield_per=batch_rows)
+    if DB_ASYNC:
+        async with (replica.AsyncSessionLocal if replica else AsyncSessionLocal)() as db:
+            result = await db.stream(stmt)
+            async for part in result.partitions():
+                yield part
+        return
+
+    db = (replica.SessionLocal if replica else SessionLocal)()
+    try:
+        result = await run_in_threadpool(db.execute, stmt)
+        parts = result.partitions()
+        while True:
+            part = await run_in_threadpool(next, parts, None)
+            if part is None:
+                break
+            yield part
+    finally:
+        await run_in_threadpool(db.close)
@@ -1,9 +1,90 @@
+from __future__ import annotations
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
 from passlib.context import CryptContext
 
+from server import metrics
+
 _pwd_ctx = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+T = TypeVar("T")
+
 def hash_password(password: str) -> str:
     return _pwd_ctx.hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return bool(hashed_password) and _pwd_ctx.verify(plain_password, hashed_password)
+
+
+# <------------------ BOUNDED POOL -------------------->
+class HashingPoolSaturated(RuntimeError):
+    """Raised instead of queueing when the pool already holds max_pending jobs."""
+
+
+class HashingPool:
+    """
+    Size-limited executor for bcrypt work with admission control.
+    bcrypt releases the GIL, so threads hash in parallel without process start-up/pickling costs,
+    and a login burst can only occupy `workers` cores instead of the whole request thread pool.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max(max_pending, workers)
+        self.rejected = 0
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _release(self, _fut: Future) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise HashingPoolSaturated(f"hashing pool saturated ({self._pending} pending)")
+            self._pending += 1
+        try:
+            fut = self._executor.submit(_timed_job, time.perf_counter(), fn, *args)
+        except BaseException:
+            self._release(None)  # type: ignore[arg-type]
+            raise
+        # released when the job really finishes, even if the awaiting request was cancelled
+        fut.add_done_callback(self._release)
+        return await asyncio.wrap_future(fut)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _timed_job(submitted: float, fn: Callable[..., T], *args: Any) -> T:
+    start = time.perf_counter()
+    metrics.HASH_POOL_WAIT.observe(start - submitted)
+    try:
+        return fn(*args)
+    finally:
+        metrics.BCRYPT.labels(fn.__name__.replace("_password", "")).observe(time.perf_counter() - start)
+
+
+_WORKERS = int(os.getenv("HASH_POOL_WORKERS", str(min(4, os.cpu_count() or 1))))
+_MAX_PENDING = int(os.getenv("HASH_POOL_MAX_PENDING", str(_WORKERS * 4)))
+
+hash_pool = HashingPool(_WORKERS, _MAX_PENDING)
+
+
+async def hash_password_async(password: str) -> str:
+    return await hash_pool.run(hash_password, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await hash_pool.run(verify_password, plain_password, hashed_password)
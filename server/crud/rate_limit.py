@@ -0,0 +1,120 @@
+"""
+Token-bucket rate limiting (used by /auth/login to keep bcrypt CPU for real users).
+
+A bucket holds up to `burst` tokens and refills at `rate_per_second`; each attempt spends one.
+The store is pluggable: InMemoryRateLimitStore is per process (fine for one node; with N workers
+the effective limit is N x the configured one). A shared store (Redis, Postgres) implements the
+same two coroutines and is installed with set_store() at startup.
+"""
+from __future__ import annotations
+import abc
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional, Tuple
+
+
+class Limit(NamedTuple):
+    rate_per_second: float
+    burst: int
+
+    @classmethod
+    def per_minute(cls, per_minute: float, burst: int) -> "Limit":
+        return cls(per_minute / 60.0, burst)
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate_per_second > 0 and self.burst > 0
+
+
+class RateLimitStore(abc.ABC):
+    @abc.abstractmethod
+    async def take(self, key: str, limit: Limit) -> float:
+        """Spend one token. Returns 0 if allowed, otherwise seconds until a token is available."""
+
+    @abc.abstractmethod
+    async def refund(self, key: str, limit: Limit) -> None:
+        """Give back a token spent by take() (never above `burst`)."""
+
+
+class InMemoryRateLimitStore(RateLimitStore):
+    """LRU-bounded so a spray of random emails/IPs cannot grow memory without limit."""
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()  # key -> (tokens, at)
+        self._lock = threading.Lock()
+
+    def _refilled(self, key: str, limit: Limit, now: float) -> float:
+        entry = self._buckets.get(key)
+        if entry is None:
+            return float(limit.burst)
+        tokens, at = entry
+        return min(float(limit.burst), tokens + (now - at) * limit.rate_per_second)
+
+    @staticmethod
+    def _wait(tokens: float, limit: Limit) -> float:
+        return 0.0 if tokens >= 1.0 else (1.0 - tokens) / limit.rate_per_second
+
+    async def take(self, key: str, limit: Limit) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens = self._refilled(key, limit, now)
+            wait = self._wait(tokens, limit)
+            if wait == 0.0:
+                tokens -= 1.0
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+    async def refund(self, key: str, limit: Limit) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if key in self._buckets:
+                self._buckets[key] = (min(float(limit.burst), self._refilled(key, limit, now) + 1.0), now)
+
+
+# <------------------ LOGIN POLICY -------------------->
+# per client IP: every attempt counts
+LOGIN_IP_LIMIT = Limit.per_minute(
+    float(os.getenv("LOGIN_IP_RATE_PER_MINUTE", "30")), int(os.getenv("LOGIN_IP_BURST", "10"))
+)
+# per target email: every attempt holds a token while it is verified (so at most `burst` bcrypt runs
+# per address at once), but only failed attempts keep it: a stuffing run can't lock the owner out for long
+LOGIN_EMAIL_LIMIT = Limit.per_minute(
+    float(os.getenv("LOGIN_EMAIL_RATE_PER_MINUTE", "5")), int(os.getenv("LOGIN_EMAIL_BURST", "5"))
+)
+TRUST_X_FORWARDED_FOR = (os.getenv("RATE_LIMIT_TRUST_X_FORWARDED_FOR") or "").strip().lower() in {"1", "true", "yes", "on"}
+
+store: RateLimitStore = InMemoryRateLimitStore(int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000")))
+
+
+def set_store(new_store: RateLimitStore) -> None:
+    global store
+    store = new_store
+
+
+def client_ip(headers, client_host: Optional[str]) -> str:
+    """
+    `client_host` is request.client.host, which uvicorn --proxy-headers already rewrites from
+    X-Forwarded-For for peers in FORWARDED_ALLOW_IPS. Keep that to the real proxy (never "*"),
+    or every rotated header value gets a fresh bucket.
+    """
+    if TRUST_X_FORWARDED_FOR:
+        # the right-most entry is the one our own proxy appended; anything left of it is client-supplied
+        forwarded = headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.rsplit(",", 1)[-1].strip()
+    return client_host or "unknown"
+
+
+def ip_key(ip: str) -> str:
+    return f"login:ip:{ip}"
+
+
+def email_key(email: str) -> str:
+    # case-folded so case variants of one address share a bucket
+    return f"login:email:{email.strip().lower()}"
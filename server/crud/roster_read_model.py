@@ -0,0 +1,276 @@
+"""
+Optional in-process roster read model (ROSTER_READ_MODEL=true).
+
+- Loaded once at startup with the regular roster query.
+- Patched in place by user_crud / user_status_crud after their commits.
+- Other workers' status changes arrive through status_events (the user_status_changed NOTIFY)
+  and are applied as they come; an event it can't apply (unknown user, deleted status row) or a
+  lost-events signal from the listener triggers a reconcile right away.
+- A reconciliation sweep compares roster_versions with the version it last loaded and reloads
+  on drift. That is what picks up other workers' user creates/renames and out-of-band SQL on
+  users, so those take up to ROSTER_RECONCILE_SECONDS. With STATUS_EVENTS_BACKEND=memory/off
+  nothing crosses processes: run a single worker or expect status changes to lag the same way.
+- If the DB is unavailable the last good snapshot keeps being served (`stale` in stats()).
+
+Order is Python string order on (first_name, last_name, id): code point order, which is what
+user_crud.ROSTER_ORDER (COLLATE "C") gives on the DB, so cursors work across both paths.
+"""
+from __future__ import annotations
+import asyncio
+import bisect
+import logging
+import os
+import secrets
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from server.crud import status_events, user_crud
+
+log = logging.getLogger(__name__)
+
+ROSTER_READ_MODEL = (os.getenv("ROSTER_READ_MODEL") or "").strip().lower() in {"1", "true", "yes", "on"}
+RECONCILE_SECONDS = float(os.getenv("ROSTER_RECONCILE_SECONDS", "30"))
+
+_Key = Tuple[str, str, int]
+
+
+class RosterReadModel:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._by_id: Dict[int, "user_crud.UserWithStatus"] = {}
+        self._keys: List[_Key] = []  # sorted roster order
+        self.loaded = False
+        self.revision = 0              # bumped on every change
+        self.db_version: Optional[int] = None
+        self.patches = 0               # local patches since the last load (see etag_version)
+        self.nonce = secrets.token_hex(4)  # this process; keeps patched ETags apart across workers
+        self.stale = False
+        self.last_reconcile: Optional[float] = None
+
+    @staticmethod
+    def _key(row: "user_crud.UserWithStatus") -> _Key:
+        return (row.first_name, row.last_name, row.id)
+
+    # ---------- bulk ----------
+    def load(self, rows: List["user_crud.UserWithStatus"], db_version: int) -> None:
+        by_id = {r.id: r for r in rows}
+        keys = sorted(self._key(r) for r in rows)
+        with self._lock:
+            self._by_id, self._keys = by_id, keys
+            self.db_version = db_version
+            self.loaded = True
+            self.stale = False
+            self.patches = 0
+            self.revision += 1
+
+    # ---------- write-through patches ----------
+    def put_user(self, user_id: int, first_name: str, last_name: str) -> None:
+        with self._lock:
+            if not self.loaded:
+                return
+            old = self._by_id.get(user_id)
+            if old is not None:
+                self._remove_key(self._key(old))
+            row = user_crud.UserWithStatus(user_id, first_name, last_name, old.status if old else None)
+            self._by_id[user_id] = row
+            bisect.insort(self._keys, self._key(row))
+            self.patches += 1
+            self.revision += 1
+
+    def set_status(self, user_id: int, status: Optional[str]) -> bool:
+        """False if the snapshot doesn't have the user (it needs a reconcile to come in)."""
+        with self._lock:
+            if not self.loaded:
+                return True
+            old = self._by_id.get(user_id)
+            if old is None:
+                return False
+            if old.status != status:
+                self._by_id[user_id] = old._replace(status=status)
+                self.patches += 1
+                self.revision += 1
+            return True
+
+    def remove_user(self, user_id: int) -> None:
+        with self._lock:
+            old = self._by_id.pop(user_id, None) if self.loaded else None
+            if old is None:
+                return
+            self._remove_key(self._key(old))
+            self.patches += 1
+            self.revision += 1
+
+    def _remove_key(self, key: _Key) -> None:
+        i = bisect.bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            del self._keys[i]
+
+    # ---------- reads ----------
+    def etag_version(self) -> str:
+        """
+        ETag version of what page() serves. Unpatched it is the roster_versions value the
+        snapshot was loaded at (same tag as the DB path). After local patches the DB version is
+        unknown until the next reload, so the tag is tied to this process; a per-process counter
+        alone would give two workers the same tag for different contents.
+        """
+        with self._lock:
+            if not self.patches:
+                return str(self.db_version)
+            return f"{self.db_version}.{self.nonce}.{self.patches}"
+
+    def page(
+        self,
+        limit: Optional[int] = None,
+        after: Optional["user_crud.RosterCursor"] = None,
+        status: Optional[str] = None,
+    ) -> List["user_crud.UserWithStatus"]:
+        """Same contract as user_crud.list_all_users_with_statuses."""
+        with self._lock:
+            start = bisect.bisect_right(self._keys, tuple(after)) if after is not None else 0
+            out: List[user_crud.UserWithStatus] = []
+            keys = self._keys
+            for i in range(start, len(keys)):
+                row = self._by_id[keys[i][2]]
+                if status is not None and row.status != status:
+                    continue
+                out.append(row)
+                if limit is not None and len(out) >= limit:
+                    break
+            return out
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": ROSTER_READ_MODEL,
+            "loaded": self.loaded,
+            "users": len(self._by_id),
+            "revision": self.revision,
+            "db_version": self.db_version,
+            "patches": self.patches,
+            "stale": self.stale,
+            "seconds_since_reconcile": (
+                round(time.monotonic() - self.last_reconcile, 3) if self.last_reconcile else None
+            ),
+        }
+
+
+model = RosterReadModel()
+
+
+# <------------------ HOOKS (called by crud after commit) -------------------->
+def on_user_written(user_id: int, first_name: str, last_name: str) -> None:
+    if ROSTER_READ_MODEL:
+        model.put_user(user_id, first_name, last_name)
+
+
+def on_user_deleted(user_id: int) -> None:
+    if ROSTER_READ_MODEL:
+        model.remove_user(user_id)
+
+
+def on_status_written(user_id: int, status: Optional[str]) -> None:
+    if ROSTER_READ_MODEL:
+        model.set_status(user_id, status)
+
+
+def _on_status_event(ev: Optional["status_events.StatusEvent"]) -> None:
+    """status_events listener. Our own writes were patched at commit, so for them this is a no-op."""
+    if ev is None:
+        _request_reconcile()  # the listener lost events
+    elif ev.membership:
+        return
+    elif not model.set_status(ev.user_id, ev.status) or ev.status is None:
+        _request_reconcile()  # new user, or a status row deleted (possibly with its user)
+
+
+def serving() -> bool:
+    return ROSTER_READ_MODEL and model.loaded
+
+
+# <------------------ LOAD / RECONCILE -------------------->
+def _load_snapshot(db) -> Tuple[List["user_crud.UserWithStatus"], int]:
+    # version first: a write racing the load can only make us reload once more, never miss it
+    version = user_crud.get_roster_version(db)
+    return user_crud.list_all_users_with_statuses(db), version
+
+
+async def reconcile(force: bool = False) -> None:
+    from server.sql_db.db import DB_ASYNC, AsyncSessionLocal, SessionLocal, run_db
+
+    try:
+        if DB_ASYNC:
+            async with AsyncSessionLocal() as db:
+                await _reconcile_with(db, force, run_db)
+        else:
+            db = SessionLocal()
+            try:
+                await _reconcile_with(db, force, run_db)
+            finally:
+                db.close()
+        model.last_reconcile = time.monotonic()
+    except Exception:
+        # keep serving the last good snapshot (if any); routes fall back to the DB until loaded
+        model.stale = model.loaded
+        log.exception("roster read model reconcile failed")
+
+
+async def _reconcile_with(db, force: bool, run_db) -> None:
+    if not force and model.loaded:
+        version = await run_db(db, user_crud.get_roster_version)
+        if version == model.db_version:
+            model.stale = False
+            return
+    rows, version = await run_db(db, _load_snapshot)
+    model.load(rows, version)
+
+
+async def _sweep_forever() -> None:
+    while True:
+        await asyncio.sleep(RECONCILE_SECONDS)
+        await reconcile()
+
+
+_task: Optional[asyncio.Task] = None
+_requested: Optional[asyncio.Task] = None
+_rerun = False
+
+
+def _request_reconcile() -> None:
+    # one at a time; a request during a run repeats it, since that run may have read the version
+    # before the write we were told about
+    global _requested, _rerun
+    if _requested is not None and not _requested.done():
+        _rerun = True
+        return
+    _requested = asyncio.get_running_loop().create_task(_reconcile_requested(), name="roster-read-model-reconcile")
+
+
+async def _reconcile_requested() -> None:
+    global _rerun
+    while True:
+        _rerun = False
+        await reconcile()
+        if not _rerun:
+            return
+
+
+async def start() -> None:
+    global _task
+    if not ROSTER_READ_MODEL:
+        return
+    await reconcile(force=True)
+    status_events.hub.add_listener(_on_status_event)
+    _task = asyncio.create_task(_sweep_forever(), name="roster-read-model-sweep")
+
+
+async def stop() -> None:
+    global _task, _requested
+    status_events.hub.remove_listener(_on_status_event)
+    for task in (_task, _requested):
+        if task:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+    _task = _requested = None
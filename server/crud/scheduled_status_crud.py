@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+from typing import Dict, List, NamedTuple, Optional
+
+from sqlalchemy.orm import Session
+from sqlalchemy import BigInteger, Text, and_, case, column, exists, func, literal, or_, select, update, values
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+
+from server.models.scheduled_status_model import ScheduledStatus
+from server.models.user_status_model import UserStatus
+from server.crud import user_status_crud
+from server.crud.user_status_crud import _status_value
+from server.schemas.user_statuses_schema import (
+    BulkOutcome,
+    MAX_SCHEDULED_PER_USER,
+    ScheduledStatusCreate,
+    ScheduleState,
+    Status,
+)
+
+_OPEN = (ScheduleState.pending.value, ScheduleState.active.value)
+# restored at the end of a range when the user had no status before it
+_FALLBACK_STATUS = Status.working.value
+# scheduled_statuses_no_overlap (schema.sql)
+_EXCLUSION_VIOLATION = "23P01"
+
+
+# <------------------ CREATE -------------------->
+def create_scheduled_status(db: Session, user_id: int, data: ScheduledStatusCreate) -> Optional[ScheduledStatus]:
+    """
+    INSERT ... SELECT WHERE NOT EXISTS (overlapping open range) RETURNING, one round-trip.
+    Ranges are half-open; an open-ended entry only occupies its start. None = overlaps.
+
+    NOT EXISTS only answers the common case cheaply: two concurrent inserts can both pass it
+    under READ COMMITTED. The scheduled_statuses_no_overlap exclusion constraint decides; its
+    violation is reported the same way (None).
+    """
+    S = ScheduledStatus
+    stop = data.ends_at or data.starts_at
+    overlapping = select(S.id).where(
+        S.user_id == user_id,
+        S.state.in_(_OPEN),
+        or_(
+            S.starts_at == data.starts_at,
+            and_(S.starts_at < stop, func.coalesce(S.ends_at, S.starts_at) > data.starts_at),
+        ),
+    )
+    row = select(
+        literal(user_id).label("user_id"),
+        literal(_status_value(data.status)).label("status"),
+        literal(data.starts_at).label("starts_at"),
+        literal(data.ends_at, S.ends_at.type).label("ends_at"),
+    ).where(~exists(overlapping))
+    stmt = (
+        pg_insert(S)
+        .from_select(["user_id", "status", "starts_at", "ends_at"], row)
+        .returning(S)
+    )
+    try:
+        created = db.scalars(stmt).one_or_none()
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        if getattr(e.orig, "sqlstate", None) == _EXCLUSION_VIOLATION:
+            return None
+        raise
+    return created
+
+
+# <------------------ READ -------------------->
+def list_scheduled_statuses(db: Session, user_id: int, include_finished: bool = False) -> List[ScheduledStatus]:
+    stmt = select(ScheduledStatus).where(ScheduledStatus.user_id == user_id)
+    if not include_finished:
+        stmt = stmt.where(ScheduledStatus.state.in_(_OPEN))
+    stmt = stmt.order_by(ScheduledStatus.starts_at.desc() if include_finished else ScheduledStatus.starts_at,
+                         ScheduledStatus.id)
+    return list(db.scalars(stmt.limit(MAX_SCHEDULED_PER_USER)))
+
+
+# <------------------ UPDATE -------------------->
+def cancel_scheduled_status(db: Session, user_id: int, schedule_id: int) -> Optional[ScheduledStatus]:
+    """
+    pending -> cancelled. An active range is ended now instead (ends_at = now()), so the
+    scheduler restores the previous status on its next tick. None if not found or finished.
+    """
+    S = ScheduledStatus
+    is_active = S.state == ScheduleState.active.value
+    stmt = (
+        update(S)
+        .where(S.id == schedule_id, S.user_id == user_id, S.state.in_(_OPEN))
+        .values(
+            state=case((is_active, S.state), else_=ScheduleState.cancelled.value),
+            ends_at=case((is_active, func.now()), else_=S.ends_at),
+        )
+        .returning(S)
+    )
+    row = db.scalars(stmt, execution_options={"populate_existing": True}).one_or_none()
+    db.commit()
+    return row
+
+
+# <------------------ SCHEDULER -------------------->
+class SchedulerTick(NamedTuple):
+    claimed: int    # rows taken by this tick (started + ended + skipped)
+    started: int    # ranges whose status was applied
+    ended: int      # ranges whose previous status was restored (or left alone, see below)
+    skipped: int    # ranges whose whole window passed before a tick saw them
+    written: int    # user_statuses rows actually changed
+
+
+def apply_due_scheduled_statuses(db: Session, batch_size: int) -> SchedulerTick:
+    """
+    One transaction, set-based:
+    1. claim up to `batch_size` active ranges past ends_at (FOR UPDATE SKIP LOCKED) -> done;
+    2. claim up to `batch_size` pending ranges past starts_at -> active (done if open-ended or
+       already over), capturing the user's current status as previous_status; when a range of
+       the same user ended in step 1, that is the status step 1 restores, not the stored one;
+    3. apply every resulting (user_id, status) with ONE bulk_upsert_user_statuses statement.
+
+    SKIP LOCKED lets several app processes run this concurrently without waiting on or
+    double-applying each other's rows. Ends are queued before starts, so when one range ends
+    as the next begins the new status wins. The previous status is only restored if the
+    scheduled one is still in force (a manual change in between is kept).
+    """
+    S = ScheduledStatus
+
+    due_end = (
+        select(S.id, UserStatus.status.label("current_status"))
+        .outerjoin(UserStatus, UserStatus.user_id == S.user_id)
+        .where(S.state == ScheduleState.active.value, S.ends_at <= func.now())
+        .order_by(S.ends_at, S.id)
+        .limit(batch_size)
+        .with_for_update(of=S, skip_locked=True)
+        .cte("due_end")
+    )
+    ended = db.execute(
+        update(S)
+        .where(S.id == due_end.c.id)
+        .values(state=ScheduleState.done.value)
+        .returning(S.user_id, S.status, S.previous_status, due_end.c.current_status)
+    ).all()
+
+    # what each ended range is about to restore (only if its status is still in force)
+    restores: Dict[int, str] = {}
+    for r in ended:
+        if r.current_status == r.status:
+            restores[r.user_id] = r.previous_status or _FALLBACK_STATUS
+
+    # a range starting as another ends (trip [Mon, Wed) then vacation [Wed, Fri)) must remember
+    # the restored status, not the pre-statement one still in user_statuses
+    current_status = UserStatus.status
+    due_start = select(S.id).outerjoin(UserStatus, UserStatus.user_id == S.user_id)
+    if restores:
+        restored = values(column("user_id", BigInteger), column("status", Text), name="restored").data(
+            sorted(restores.items())
+        ).alias("restored")
+        due_start = due_start.outerjoin(restored, restored.c.user_id == S.user_id)
+        current_status = func.coalesce(restored.c.status, UserStatus.status)
+    due_start = (
+        due_start.add_columns(current_status.label("current_status"))
+        .where(S.state == ScheduleState.pending.value, S.starts_at <= func.now())
+        .order_by(S.starts_at, S.id)
+        .limit(batch_size)
+        .with_for_update(of=S, skip_locked=True)
+        .cte("due_start")
+    )
+    in_window = or_(S.ends_at.is_(None), S.ends_at > func.now())
+    started = db.execute(
+        update(S)
+        .where(S.id == due_start.c.id)
+        .values(
+            state=case((S.ends_at > func.now(), ScheduleState.active.value), else_=ScheduleState.done.value),
+            previous_status=due_start.c.current_status,
+        )
+        .returning(S.user_id, S.status, in_window.label("applied"))
+    ).all()
+
+    pairs = list(restores.items())
+    pairs += [(r.user_id, r.status) for r in started if r.applied]
+    written = 0
+    if pairs:
+        results = user_status_crud.bulk_upsert_user_statuses(db, pairs)  # commits
+        written = sum(r.outcome in (BulkOutcome.created, BulkOutcome.updated) for r in results)
+    else:
+        db.commit()
+
+    applied = sum(1 for r in started if r.applied)
+    return SchedulerTick(
+        claimed=len(ended) + len(started),
+        started=applied,
+        ended=len(ended),
+        skipped=len(started) - applied,
+        written=written,
+    )
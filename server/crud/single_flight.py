@@ -0,0 +1,86 @@
+"""
+Single-flight request coalescing (per process, SINGLE_FLIGHT_ENABLED=true by default).
+
+Concurrent callers asking for the same key share one in-flight call and its result instead of
+each running the same query: when hundreds of roster polls line up, the first one queries and
+the rest await it. Nothing is cached; the key is forgotten as soon as the call finishes.
+
+A caller can receive the result of a call that started just before it arrived, so keys must
+carry whatever makes a result valid for that caller (e.g. the roster ETag/version).
+If the leading caller is cancelled (client went away), waiting callers retry and one of them
+becomes the new leader. Callers per call are exported as single_flight_callers{flight}.
+"""
+from __future__ import annotations
+import asyncio
+import os
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+from server import metrics
+
+SINGLE_FLIGHT_ENABLED = (os.getenv("SINGLE_FLIGHT_ENABLED") or "true").strip().lower() in {"1", "true", "yes", "on"}
+
+T = TypeVar("T")
+
+
+class _LeaderCancelled(Exception):
+    pass
+
+
+class _Call:
+    __slots__ = ("future", "callers")
+
+    def __init__(self) -> None:
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.callers = 1
+
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, _Call] = {}  # event-loop confined; no lock needed
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        if not SINGLE_FLIGHT_ENABLED:
+            return await fn()
+        while True:
+            call = self._calls.get(key)
+            if call is None:
+                return await self._lead(key, fn)
+            call.callers += 1
+            try:
+                # shield: a cancelled follower must not cancel the shared future
+                return await asyncio.shield(call.future)
+            except _LeaderCancelled:
+                continue
+
+    async def _lead(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        call = self._calls[key] = _Call()
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            call.future.set_exception(_LeaderCancelled())
+            raise
+        except BaseException as e:
+            call.future.set_exception(e)
+            raise
+        else:
+            call.future.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
+            # nobody awaited it: don't log "exception never retrieved"
+            if call.callers == 1 and call.future.done() and not call.future.cancelled():
+                call.future.exception()
+            metrics.SINGLE_FLIGHT_CALLERS.labels(self.name).observe(call.callers)
+
+
+roster = SingleFlight("roster")            # roster pages, keyed by (ETag, page, filter, encoding)
+user_status = SingleFlight("user_status")  # get_user_status_by_id, keyed by user id
+
+
+def stats() -> Dict[str, int]:
+    return {f.name: f.in_flight for f in (roster, user_status)}
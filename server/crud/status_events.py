@@ -0,0 +1,310 @@
+"""
+Status-change push channel.
+
+CRUD writes call `emit(db, event)` inside their transaction. The configured broker delivers
+committed events to this process's `hub`, which fans them out to every connected stream:
+
+- postgres: a row trigger on user_statuses (schema.sql) calls `pg_notify` in the writer's
+  transaction, so it is sent on COMMIT, dropped on ROLLBACK, costs the writer no extra round-trip
+  and also covers bulk/out-of-band writes. One LISTEN connection per process. Works across workers.
+- memory:   events are parked on the Session and delivered by an after_commit hook. Single
+            process only; meant for tests and local runs without Postgres.
+- off:      no events.
+"""
+from __future__ import annotations
+import asyncio
+import json
+import logging
+import os
+from datetime import datetime
+from typing import AsyncIterator, Callable, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+log = logging.getLogger(__name__)
+
+STATUS_EVENTS_BACKEND = (os.getenv("STATUS_EVENTS_BACKEND") or "postgres").strip().lower()
+CHANNEL = "user_status_changed"
+SUBSCRIBER_QUEUE_SIZE = int(os.getenv("STATUS_EVENTS_QUEUE_SIZE", "256"))
+
+_PENDING_KEY = "pending_status_events"
+
+
+class StatusEvent(NamedTuple):
+    user_id: int
+    status: Optional[str]           # None = status row deleted
+    updated_at: Optional[str] = None  # ISO-8601
+    team_ids: Optional[Tuple[int, ...]] = None  # None = unknown (memory backend): every stream gets it
+    membership: bool = False        # user joined/left team_ids: those teams' streams must resync
+
+    @classmethod
+    def of(cls, user_id: int, status: Optional[str], updated_at: Optional[datetime] = None) -> "StatusEvent":
+        return cls(user_id, status, updated_at.isoformat() if updated_at else None)
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {"user_id": self.user_id, "status": self.status, "updated_at": self.updated_at},
+            separators=(",", ":"),
+        )
+
+    @classmethod
+    def from_json(cls, raw: str) -> "StatusEvent":
+        d = json.loads(raw)
+        team_ids = d.get("team_ids")
+        return cls(
+            int(d["user_id"]),
+            d.get("status"),
+            d.get("updated_at"),
+            tuple(int(t) for t in team_ids) if team_ids is not None else None,
+            bool(d.get("membership", False)),
+        )
+
+
+# <------------------ FAN-OUT -------------------->
+_RESYNC = object()  # queue sentinel: wakes a waiting stream() after `overflowed` was set
+
+
+class Subscription:
+    def __init__(self, team_id: Optional[int] = None) -> None:
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.overflowed = False
+        self.team_id = team_id  # None = company-wide roster
+
+    def wants(self, ev: StatusEvent) -> bool:
+        if self.team_id is None:
+            return not ev.membership  # membership changes don't touch the company roster
+        return ev.team_ids is None or self.team_id in ev.team_ids
+
+    def _offer(self, ev: StatusEvent) -> None:
+        if not self.wants(ev):
+            return
+        try:
+            self.queue.put_nowait(ev)
+        except asyncio.QueueFull:
+            # slow consumer: drop the backlog and ask it to reload the roster once
+            self.request_resync()
+
+    def request_resync(self) -> None:
+        """Drop what is queued (a reload covers it) and wake the stream so it says so now."""
+        self.overflowed = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(_RESYNC)
+
+
+class StatusEventHub:
+    """One per process; lives on the app's event loop."""
+
+    def __init__(self) -> None:
+        self._subs: Set[Subscription] = set()
+        self._listeners: List[Callable[[Optional[StatusEvent]], None]] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subs)
+
+    def bind(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._loop = loop
+
+    def subscribe(self, team_id: Optional[int] = None) -> Subscription:
+        sub = Subscription(team_id)
+        self._subs.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        self._subs.discard(sub)
+
+    def add_listener(self, fn: Callable[[Optional[StatusEvent]], None]) -> None:
+        """In-process consumer called on the loop with every event, or None when events were lost."""
+        self._listeners.append(fn)
+
+    def remove_listener(self, fn: Callable[[Optional[StatusEvent]], None]) -> None:
+        if fn in self._listeners:
+            self._listeners.remove(fn)
+
+    def deliver(self, ev: StatusEvent) -> None:
+        """Thread-safe: sync-mode CRUD commits from the thread pool."""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        if _running_loop() is loop:
+            self._fanout(ev)
+        else:
+            loop.call_soon_threadsafe(self._fanout, ev)
+
+    def resync_all(self) -> None:
+        for sub in list(self._subs):
+            sub.request_resync()
+        self._notify_listeners(None)
+
+    def _fanout(self, ev: StatusEvent) -> None:
+        for sub in list(self._subs):
+            sub._offer(ev)
+        self._notify_listeners(ev)
+
+    def _notify_listeners(self, ev: Optional[StatusEvent]) -> None:
+        for fn in list(self._listeners):
+            try:
+                fn(ev)
+            except Exception:
+                log.exception("status event listener failed")
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+hub = StatusEventHub()
+
+
+# <------------------ BROKERS -------------------->
+class InMemoryBroker:
+    def emit(self, db: Session, ev: StatusEvent) -> None:
+        db.info.setdefault(_PENDING_KEY, []).append(ev)
+
+    def emit_many(self, db: Session, evs: Sequence[StatusEvent]) -> None:
+        db.info.setdefault(_PENDING_KEY, []).extend(evs)
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+
+class PostgresBroker:
+    def __init__(self) -> None:
+        self._task: Optional[asyncio.Task] = None
+
+    # the NOTIFY itself comes from the trg_user_statuses_notify* triggers
+    def emit(self, db: Session, ev: StatusEvent) -> None:
+        pass
+
+    def emit_many(self, db: Session, evs: Sequence[StatusEvent]) -> None:
+        pass
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._listen_forever(), name="status-events-listener")
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _listen_forever(self) -> None:
+        import psycopg
+        from server.sql_db.db import engine
+
+        conninfo = engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+        backoff = 1.0
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(conninfo, autocommit=True) as conn:
+                    await conn.execute(f"LISTEN {CHANNEL}")
+                    backoff = 1.0
+                    # anything sent while we were disconnected is lost: make clients reload once
+                    hub.resync_all()
+                    async for n in conn.notifies():
+                        try:
+                            hub.deliver(StatusEvent.from_json(n.payload))
+                        except (ValueError, KeyError):
+                            log.warning("bad %s payload: %r", CHANNEL, n.payload)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                log.exception("status events listener failed; reconnecting in %.0fs", backoff)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+
+
+class _NoopBroker:
+    def emit(self, db: Session, ev: StatusEvent) -> None:
+        pass
+
+    def emit_many(self, db: Session, evs: Sequence[StatusEvent]) -> None:
+        pass
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+
+def _make_broker():
+    if STATUS_EVENTS_BACKEND == "memory":
+        return InMemoryBroker()
+    if STATUS_EVENTS_BACKEND == "off":
+        return _NoopBroker()
+    return PostgresBroker()
+
+
+broker = _make_broker()
+
+
+@event.listens_for(Session, "after_commit")
+def _deliver_pending(session: Session) -> None:
+    pending: List[StatusEvent] = session.info.pop(_PENDING_KEY, None) or []
+    for ev in pending:
+        hub.deliver(ev)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_pending(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+# <------------------ API -------------------->
+def emit(db: Session, ev: StatusEvent) -> None:
+    """Call inside the writing transaction, before commit (only for rows that really changed)."""
+    broker.emit(db, ev)
+
+
+def emit_many(db: Session, evs: Sequence[StatusEvent]) -> None:
+    if evs:
+        broker.emit_many(db, evs)
+
+
+async def start() -> None:
+    hub.bind(asyncio.get_running_loop())
+    await broker.start()
+
+
+async def stop() -> None:
+    await broker.stop()
+
+
+async def stream(heartbeat_seconds: float = 15.0, team_id: Optional[int] = None) -> AsyncIterator[str]:
+    """
+    Server-Sent Events for one client: `status` events, `resync` when it must reload.
+    With team_id only that team's members' changes are sent (and a resync when membership changes).
+    """
+    sub = hub.subscribe(team_id)
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            if sub.overflowed:
+                sub.overflowed = False
+                yield "event: resync\ndata: {}\n\n"
+            try:
+                ev = await asyncio.wait_for(sub.queue.get(), timeout=heartbeat_seconds)
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                continue
+            if ev is _RESYNC:
+                continue  # the resync goes out at the top of the loop
+            if ev.membership:
+                yield "event: resync\ndata: {}\n\n"
+                continue
+            yield f"event: status\ndata: {ev.to_json()}\n\n"
+    finally:
+        hub.unsubscribe(sub)
@@ -0,0 +1,100 @@
+"""
+Background scheduler for scheduled statuses (STATUS_SCHEDULER=true, the default).
+
+Every STATUS_SCHEDULER_INTERVAL_SECONDS each app process runs
+scheduled_status_crud.apply_due_scheduled_statuses in batches of STATUS_SCHEDULER_BATCH_SIZE
+until nothing is due. Rows are claimed with FOR UPDATE SKIP LOCKED, so running it in every
+worker and replica is safe: a 9am wave of 50k vacations becomes ~50 set-based transactions
+shared between processes, not 50k status requests.
+
+The same task keeps user_status_history's monthly partitions HISTORY_PARTITION_MONTHS_AHEAD
+months ahead: at startup, then every HISTORY_PARTITION_CHECK_SECONDS.
+"""
+from __future__ import annotations
+import asyncio
+import logging
+import os
+import time
+from typing import Optional
+
+from server import metrics
+from server.crud import scheduled_status_crud, user_status_history_crud
+from server.crud.scheduled_status_crud import SchedulerTick
+
+log = logging.getLogger(__name__)
+
+STATUS_SCHEDULER = (os.getenv("STATUS_SCHEDULER") or "true").strip().lower() in {"1", "true", "yes", "on"}
+INTERVAL_SECONDS = float(os.getenv("STATUS_SCHEDULER_INTERVAL_SECONDS", "30"))
+BATCH_SIZE = int(os.getenv("STATUS_SCHEDULER_BATCH_SIZE", "1000"))
+PARTITION_MONTHS_AHEAD = int(os.getenv("HISTORY_PARTITION_MONTHS_AHEAD", "12"))
+PARTITION_CHECK_SECONDS = float(os.getenv("HISTORY_PARTITION_CHECK_SECONDS", "3600"))
+
+
+async def _in_session(fn, *args):
+    from server.sql_db.db import DB_ASYNC, AsyncSessionLocal, SessionLocal, run_db
+
+    if DB_ASYNC:
+        async with AsyncSessionLocal() as db:
+            return await run_db(db, fn, *args)
+    db = SessionLocal()
+    try:
+        return await run_db(db, fn, *args)
+    finally:
+        db.close()
+
+
+async def run_once(batch_size: int = BATCH_SIZE) -> SchedulerTick:
+    """Apply everything due now; returns the totals over all batches."""
+    totals = SchedulerTick(0, 0, 0, 0, 0)
+    while True:
+        tick = await _in_session(scheduled_status_crud.apply_due_scheduled_statuses, batch_size)
+        totals = SchedulerTick(*(a + b for a, b in zip(totals, tick)))
+        metrics.SCHEDULED_STATUS_TRANSITIONS.labels("started").inc(tick.started)
+        metrics.SCHEDULED_STATUS_TRANSITIONS.labels("ended").inc(tick.ended)
+        metrics.SCHEDULED_STATUS_TRANSITIONS.labels("skipped").inc(tick.skipped)
+        if tick.claimed < batch_size:
+            return totals
+
+
+async def ensure_history_partitions(months_ahead: int = PARTITION_MONTHS_AHEAD) -> None:
+    await _in_session(user_status_history_crud.ensure_partitions, months_ahead)
+
+
+async def _run_forever() -> None:
+    partitions_checked: Optional[float] = None
+    while True:
+        if partitions_checked is None or time.monotonic() - partitions_checked >= PARTITION_CHECK_SECONDS:
+            try:
+                await ensure_history_partitions()
+                partitions_checked = time.monotonic()
+            except Exception:
+                log.exception("history partition maintenance failed")
+        try:
+            totals = await run_once()
+            if totals.claimed:
+                log.info("scheduled statuses applied: %s", totals._asdict())
+        except Exception:
+            # next interval retries; claimed rows were rolled back with the failed transaction
+            log.exception("status scheduler tick failed")
+        await asyncio.sleep(INTERVAL_SECONDS)
+
+
+_task: Optional[asyncio.Task] = None
+
+
+async def start() -> None:
+    global _task
+    if not STATUS_SCHEDULER:
+        return
+    _task = asyncio.create_task(_run_forever(), name="status-scheduler")
+
+
+async def stop() -> None:
+    global _task
+    if _task:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
@@ -0,0 +1,154 @@
+"""
+Write-behind batching for self-service status updates (opt-in: STATUS_WRITE_BEHIND=true).
+
+update_current_user_status enqueues (user_id, status) and awaits its batch. A single flusher
+task per process drains the queue every STATUS_WRITE_BEHIND_FLUSH_MS, or as soon as
+STATUS_WRITE_BEHIND_MAX_BATCH items are waiting, with ONE user_status_crud.bulk_update_user_statuses
+statement and one commit in its own session, so a burst of N updates pays for one fsync instead
+of N. A request is answered only after its batch committed.
+
+Per-user order: a batch holds at most one item per user; a later update of the same user waits
+for the next batch, and batches are flushed one at a time.
+"""
+from __future__ import annotations
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from typing import Deque, List, NamedTuple, Optional
+
+from server import metrics
+from server.crud import user_status_crud
+from server.crud.user_status_crud import StatusWrite
+
+log = logging.getLogger(__name__)
+
+STATUS_WRITE_BEHIND = (os.getenv("STATUS_WRITE_BEHIND") or "").strip().lower() in {"1", "true", "yes", "on"}
+FLUSH_SECONDS = float(os.getenv("STATUS_WRITE_BEHIND_FLUSH_MS", "5")) / 1000.0
+MAX_BATCH = int(os.getenv("STATUS_WRITE_BEHIND_MAX_BATCH", "500"))
+
+
+class _Pending(NamedTuple):
+    user_id: int
+    status: str
+    future: asyncio.Future
+    enqueued: float
+
+
+class WriteBehindQueue:
+    def __init__(self, flush_seconds: float = FLUSH_SECONDS, max_batch: int = MAX_BATCH):
+        self.flush_seconds = flush_seconds
+        self.max_batch = max_batch
+        self._pending: Deque[_Pending] = deque()
+        self._nonempty: Optional[asyncio.Event] = None
+        self._full: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    @property
+    def depth(self) -> int:
+        return len(self._pending)
+
+    async def submit(self, user_id: int, status) -> Optional[StatusWrite]:
+        """Same result as user_status_crud.update_user_status, once the batch has committed."""
+        if self._task is None:
+            raise RuntimeError("status write-behind queue is not running")
+        fut = asyncio.get_running_loop().create_future()
+        self._pending.append(_Pending(user_id, user_status_crud._status_value(status), fut, time.perf_counter()))
+        self._nonempty.set()
+        if len(self._pending) >= self.max_batch:
+            self._full.set()
+        return await fut
+
+    def _take_batch(self) -> List[_Pending]:
+        batch: List[_Pending] = []
+        users = set()
+        keep: Deque[_Pending] = deque()
+        while self._pending:
+            item = self._pending.popleft()
+            if item.future.done():  # caller went away before the write: drop it
+                continue
+            if item.user_id in users or len(batch) >= self.max_batch:
+                keep.append(item)
+            else:
+                users.add(item.user_id)
+                batch.append(item)
+        self._pending = keep
+        if len(self._pending) < self.max_batch:
+            self._full.clear()
+        return batch
+
+    async def _flush(self, batch: List[_Pending]) -> None:
+        from server.sql_db.db import DB_ASYNC, AsyncSessionLocal, SessionLocal, run_db
+
+        items = [(p.user_id, p.status) for p in batch]
+        start = time.perf_counter()
+        try:
+            if DB_ASYNC:
+                async with AsyncSessionLocal() as db:
+                    results = await run_db(db, user_status_crud.bulk_update_user_statuses, items)
+            else:
+                db = SessionLocal()
+                try:
+                    results = await run_db(db, user_status_crud.bulk_update_user_statuses, items)
+                finally:
+                    db.close()
+        except Exception as e:
+            log.warning("status write-behind flush of %d items failed", len(batch), exc_info=True)
+            for p in batch:
+                if not p.future.done():
+                    p.future.set_exception(e)
+            return
+        done = time.perf_counter()
+        metrics.WRITE_BEHIND_BATCH.observe(len(batch))
+        metrics.WRITE_BEHIND_FLUSH.observe(done - start)
+        for p in batch:
+            metrics.WRITE_BEHIND_WAIT.observe(done - p.enqueued)
+            if not p.future.done():
+                p.future.set_result(results.get(p.user_id))
+
+    async def _run(self) -> None:
+        while True:
+            await self._nonempty.wait()
+            if not self._pending:
+                if self._stopping:
+                    return
+                self._nonempty.clear()
+                continue
+            if len(self._pending) < self.max_batch and not self._stopping:
+                try:
+                    await asyncio.wait_for(self._full.wait(), self.flush_seconds)
+                except asyncio.TimeoutError:
+                    pass
+            batch = self._take_batch()
+            if batch:
+                await self._flush(batch)
+
+    async def start(self) -> None:
+        self._nonempty, self._full = asyncio.Event(), asyncio.Event()
+        self._stopping = False
+        self._task = asyncio.create_task(self._run(), name="status-write-behind")
+
+    async def stop(self) -> None:
+        """Flushes what is queued, then ends the flusher."""
+        if self._task is None:
+            return
+        self._stopping = True
+        self._nonempty.set()
+        try:
+            await self._task
+        finally:
+            self._task = None
+
+
+queue = WriteBehindQueue()
+
+
+async def start() -> None:
+    if STATUS_WRITE_BEHIND:
+        await queue.start()
+
+
+async def stop() -> None:
+    await queue.stop()
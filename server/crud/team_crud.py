@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from typing import List, Optional, Sequence
+from sqlalchemy.orm import Session
+from sqlalchemy import select, insert, delete, literal
+from sqlalchemy.types import BigInteger
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from server.models.roster_version_model import RosterVersion
+from server.models.team_model import Team, TeamMember
+from server.models.user_model import User
+from server.models.user_status_model import UserStatus
+from server.crud.user_crud import ROSTER_ORDER, RosterCursor, UserWithStatus, roster_after
+from server.schemas.team_schema import TeamCreate
+
+
+def team_scope(team_id: int) -> str:
+    """roster_versions scope of a team roster (kept in sync by the schema.sql triggers)."""
+    return f"team:{team_id}"
+
+
+# <------------------ CREATE -------------------->
+def create_team(db: Session, data: TeamCreate) -> Team:
+    team = db.scalars(insert(Team).values(name=data.name).returning(Team)).one()
+    db.commit()
+    return team
+
+
+def add_team_members(db: Session, team_id: int, user_ids: Sequence[int]) -> int:
+    """Adds existing users only; already-members are skipped. Returns the number added."""
+    existing_users = select(User.id.label("user_id"), literal(team_id, BigInteger).label("team_id")).where(
+        User.id.in_(sorted(set(user_ids)))
+    )
+    stmt = (
+        pg_insert(TeamMember)
+        .from_select(["user_id", "team_id"], existing_users)
+        .on_conflict_do_nothing(index_elements=[TeamMember.team_id, TeamMember.user_id])
+    )
+    added = db.execute(stmt).rowcount
+    db.commit()
+    return added
+
+
+# <------------------ READ -------------------->
+def get_team(db: Session, team_id: int) -> Optional[Team]:
+    return db.get(Team, team_id)
+
+
+def list_teams(db: Session) -> List[Team]:
+    return list(db.scalars(select(Team).order_by(Team.name, Team.id)))
+
+
+def list_team_users_with_statuses(
+    db: Session,
+    team_id: int,
+    limit: Optional[int] = None,
+    after: Optional[RosterCursor] = None,
+    status: Optional[str] = None,
+) -> List[UserWithStatus]:
+    """
+    Same contract as user_crud.list_all_users_with_statuses, restricted to one team.
+    Driven from the team_members primary key (team_id, user_id), so the cost follows the
+    team's size, not the company's.
+    """
+    stmt = (
+        select(User.id, User.first_name, User.last_name, UserStatus.status)
+        .select_from(TeamMember)
+        .join(User, User.id == TeamMember.user_id)
+        .where(TeamMember.team_id == team_id)
+    )
+    if status is not None:
+        stmt = stmt.join(UserStatus, UserStatus.user_id == User.id).where(UserStatus.status == status)
+    else:
+        stmt = stmt.join(UserStatus, UserStatus.user_id == User.id, isouter=True)
+    if after is not None:
+        stmt = stmt.where(roster_after(after))
+    stmt = stmt.order_by(*ROSTER_ORDER)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return [
+        UserWithStatus(id=row.id, first_name=row.first_name, last_name=row.last_name, status=row.status)
+        for row in db.execute(stmt)
+    ]
+
+
+# <------------------ DELETE -------------------->
+def remove_team_members(db: Session, team_id: int, user_ids: Sequence[int]) -> int:
+    stmt = delete(TeamMember).where(TeamMember.team_id == team_id, TeamMember.user_id.in_(sorted(set(user_ids))))
+    removed = db.execute(stmt).rowcount
+    db.commit()
+    return removed
+
+
+def delete_team(db: Session, team_id: int) -> bool:
+    """
+    Also drops the team's roster_versions row, so its roster answers 404 again (the route only
+    looks the team up while the version is 0). A separate statement: the membership cascade's
+    triggers bump (re-create) that row at the end of the DELETE.
+    """
+    deleted = db.execute(delete(Team).where(Team.id == team_id)).rowcount
+    if deleted:
+        db.execute(delete(RosterVersion).where(RosterVersion.scope == team_scope(team_id)))
+    db.commit()
+    return bool(deleted)
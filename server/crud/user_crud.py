@@ -2,7 +2,8 @@ from __future__ import annotations
 
 from typing import List, Optional,NamedTuple
 from sqlalchemy.orm import Session
-from sqlalchemy import select, update, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, literal, literal_column, or_, select, insert, update, delete, tuple_
 
 from server.models.user_model import User
 from server.schemas.user_schema import (
@@ -10,19 +11,23 @@ from server.schemas.user_schema import (
     UserUpdate,
 )
 from server.models.user_status_model import UserStatus
+from server.models.roster_version_model import RosterVersion
+from server.crud import principal_cache, roster_read_model
+from server.sql_db.db import async_variant
 
 
 # <------------------ CREATE -------------------->
 def create_user(db: Session, data: UserCreate) -> User:
-    user = User(
-        email=str(data.email), 
+    # INSERT ... RETURNING: the new row (id included) comes back with the insert, no refresh
+    stmt = insert(User).values(
+        email=str(data.email),
         password=data.password,  # already a HASH
         first_name=data.first_name,
         last_name=data.last_name,
-    )
-    db.add(user)
+    ).returning(User)
+    user = db.scalars(stmt).one()
     db.commit()
-    db.refresh(user)
+    roster_read_model.on_user_written(user.id, user.first_name, user.last_name)
     return user
 
 
@@ -31,10 +36,45 @@ def get_user_by_id(db: Session, user_id: int) -> Optional[User]:
     return db.get(User, user_id)
 
 
-def get_user_by_email(db: Session, email: str) -> Optional[User]:
+class UserPrincipal(NamedTuple):
+    """Session-free snapshot of the authenticated user (safe to cache across requests)."""
+    id: int
+    email: str
+    first_name: str
+    last_name: str
+
+
+def _principal_stmt(user_id: int):
+    return select(User.id, User.email, User.first_name, User.last_name).where(User.id == user_id)
+
+
+def _as_principal(row) -> Optional[UserPrincipal]:
+    if not row:
+        return None
+    return UserPrincipal(id=row.id, email=row.email, first_name=row.first_name, last_name=row.last_name)
+
+
+def get_user_principal(db: Session, user_id: int) -> Optional[UserPrincipal]:
+    return _as_principal(db.execute(_principal_stmt(user_id)).first())
+
+
+@async_variant(get_user_principal)
+async def get_user_principal_async(db: AsyncSession, user_id: int) -> Optional[UserPrincipal]:
+    return _as_principal((await db.execute(_principal_stmt(user_id))).first())
+
+
+def _user_by_email_stmt(email: str):
     # Case-sensitive match
-    stmt = select(User).where(User.email == email)
-    return db.execute(stmt).scalar_one_or_none()
+    return select(User).where(User.email == email)
+
+
+def get_user_by_email(db: Session, email: str) -> Optional[User]:
+    return db.execute(_user_by_email_stmt(email)).scalar_one_or_none()
+
+
+@async_variant(get_user_by_email)
+async def get_user_by_email_async(db: AsyncSession, email: str) -> Optional[User]:
+    return (await db.execute(_user_by_email_stmt(email))).scalar_one_or_none()
 
 
 def list_users(db: Session, limit: int = 100, offset: int = 0) -> List[User]:
@@ -44,18 +84,34 @@ def list_users(db: Session, limit: int = 100, offset: int = 0) -> List[User]:
 
 # <------------------ UPDATE -------------------->
 def update_user(db: Session, user_id: int, data: UserUpdate) -> Optional[User]:
-    user = db.get(User, user_id)
-    if not user:
-        return None
+    changes = {}
     if data.first_name is not None:
-        user.first_name = data.first_name
+        changes["first_name"] = data.first_name
     if data.last_name is not None:
-        user.last_name = data.last_name
+        changes["last_name"] = data.last_name
+    if not changes:
+        return db.get(User, user_id)
+
+    # UPDATE ... RETURNING: one round-trip instead of get + commit + refresh
+    stmt = update(User).where(User.id == user_id).values(**changes).returning(User)
+    user = db.scalars(stmt, execution_options={"populate_existing": True}).one_or_none()
     db.commit()
-    db.refresh(user)
+    if user is None:
+        return None
+    principal_cache.invalidate_user(user_id)
+    roster_read_model.on_user_written(user.id, user.first_name, user.last_name)
     return user
 
 
+# <------------------ DELETE -------------------->
+def delete_user(db: Session, user_id: int) -> bool:
+    # user_statuses rows go with it (ON DELETE CASCADE)
+    result = db.execute(delete(User).where(User.id == user_id))
+    db.commit()
+    principal_cache.invalidate_user(user_id)
+    roster_read_model.on_user_deleted(user_id)
+    return result.rowcount > 0
+
 
 class UserWithStatus(NamedTuple):
     id: int
@@ -89,20 +145,39 @@ def get_user_status_by_id(db: Session, user_id: int) -> Optional[UserWithStatus]
     )
 
 
-def list_all_users_with_statuses(db: Session) -> List[UserWithStatus]:
-    """
-    List all users with their current status.
-    Users without status records will have status=None.
-    Results are ordered by first_name, then last_name.
-    """
-    stmt = (
-        select(User.id, User.first_name, User.last_name, UserStatus.status)
-        .select_from(User)
-        .join(UserStatus, UserStatus.user_id == User.id, isouter=True)
-        .order_by(User.first_name.asc(), User.last_name.asc())
-    )
-    rows = db.execute(stmt).all()
-    
+class RosterCursor(NamedTuple):
+    """Keyset position in roster order: the last (first_name, last_name, id) already returned."""
+    first_name: str
+    last_name: str
+    id: int
+
+
+# Roster order compares names bytewise (COLLATE "C"), independent of the database's locale.
+# That is also Python's str order, so a cursor from the DB path and one from the in-memory
+# roster_read_model path mean the same position.
+ROSTER_ORDER = (User.first_name.collate("C"), User.last_name.collate("C"), User.id)
+
+
+def roster_after(after: RosterCursor):
+    """Keyset predicate: rows strictly after `after` in ROSTER_ORDER."""
+    return tuple_(*ROSTER_ORDER) > tuple_(after.first_name, after.last_name, after.id)
+
+
+def _roster_stmt(limit: Optional[int], after: Optional[RosterCursor], status: Optional[str]):
+    stmt = select(User.id, User.first_name, User.last_name, UserStatus.status).select_from(User)
+    if status is not None:
+        stmt = stmt.join(UserStatus, UserStatus.user_id == User.id).where(UserStatus.status == status)
+    else:
+        stmt = stmt.join(UserStatus, UserStatus.user_id == User.id, isouter=True)
+    if after is not None:
+        stmt = stmt.where(roster_after(after))
+    stmt = stmt.order_by(*ROSTER_ORDER)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return stmt
+
+
+def _as_users_with_status(rows) -> List[UserWithStatus]:
     return [
         UserWithStatus(
             id=row.id,
@@ -111,4 +186,98 @@ def list_all_users_with_statuses(db: Session) -> List[UserWithStatus]:
             status=row.status
         )
         for row in rows
-    ]
\ No newline at end of file
+    ]
+
+
+def list_all_users_with_statuses(
+    db: Session,
+    limit: Optional[int] = None,
+    after: Optional[RosterCursor] = None,
+    status: Optional[str] = None,
+) -> List[UserWithStatus]:
+    """
+    List users with their current status in ROSTER_ORDER (first_name, last_name, id).
+    Users without status records will have status=None (unless filtering by status).
+    Paging is keyset-based: pass the last row of the previous page as `after`;
+    with idx_users_roster_order each page is an index range scan, O(limit) not O(users).
+    """
+    return _as_users_with_status(db.execute(_roster_stmt(limit, after, status)).all())
+
+
+@async_variant(list_all_users_with_statuses)
+async def list_all_users_with_statuses_async(
+    db: AsyncSession,
+    limit: Optional[int] = None,
+    after: Optional[RosterCursor] = None,
+    status: Optional[str] = None,
+) -> List[UserWithStatus]:
+    return _as_users_with_status((await db.execute(_roster_stmt(limit, after, status))).all())
+
+
+MAX_SEARCH_RESULTS = 50
+# below this many characters a query has no trigrams; only prefix matching is used
+_TRIGRAM_MIN_CHARS = 3
+
+
+def _search_doc():
+    # must match idx_users_search_trgm in schema.sql (literal separators, not bind params)
+    sep = literal_column("' '")
+    return func.lower(User.first_name + sep + User.last_name + sep + User.email)
+
+
+def _like_escape(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def search_users(db: Session, query: str, limit: int = 20) -> List[UserWithStatus]:
+    """
+    Typeahead over first name, last name and email (case-insensitive).
+    1-2 characters: prefix match on any field (text_pattern_ops indexes).
+    Longer: substring or fuzzy word match (pg_trgm `<%`) on the combined document via the GIN
+    trigram index; prefix hits rank first, then by word_similarity, then roster order.
+    """
+    term = " ".join(query.split()).lower()
+    if not term:
+        return []
+    escaped = _like_escape(term)
+    prefix = escaped + "%"
+    prefix_hit = or_(
+        func.lower(User.first_name).like(prefix, escape="\\"),
+        func.lower(User.last_name).like(prefix, escape="\\"),
+        func.lower(User.email).like(prefix, escape="\\"),
+    )
+    stmt = (
+        select(User.id, User.first_name, User.last_name, UserStatus.status)
+        .select_from(User)
+        .join(UserStatus, UserStatus.user_id == User.id, isouter=True)
+    )
+    if len(term) < _TRIGRAM_MIN_CHARS:
+        stmt = stmt.where(prefix_hit).order_by(User.first_name.asc(), User.last_name.asc(), User.id.asc())
+    else:
+        doc = _search_doc()
+        stmt = stmt.where(
+            or_(doc.like("%" + escaped + "%", escape="\\"), literal(term).op("<%")(doc))
+        ).order_by(
+            prefix_hit.desc(),
+            func.word_similarity(term, doc).desc(),
+            User.first_name.asc(), User.last_name.asc(), User.id.asc(),
+        )
+    rows = db.execute(stmt.limit(limit)).all()
+    return [UserWithStatus(id=r.id, first_name=r.first_name, last_name=r.last_name, status=r.status) for r in rows]
+
+
+def _roster_version_stmt(scope: str):
+    return select(RosterVersion.version).where(RosterVersion.scope == scope)
+
+
+def get_roster_version(db: Session, scope: str = "all") -> int:
+    """
+    Trigger-maintained change counter of the roster (see roster_versions in schema.sql).
+    Read it BEFORE the roster itself so a concurrent write can only make the ETag too old, never too new.
+    """
+    return db.execute(_roster_version_stmt(scope)).scalar_one_or_none() or 0
+
+
+@async_variant(get_roster_version)
+async def get_roster_version_async(db: AsyncSession, scope: str = "all") -> int:
+    return (await db.execute(_roster_version_stmt(scope))).scalar_one_or_none() or 0
@@ -1,34 +1,189 @@
 from __future__ import annotations
 
-from typing import List, Optional
-from datetime import datetime, timezone
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+from datetime import datetime
 
 from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import (
+    BigInteger, Text, column, delete, exists, false, func, literal_column, select, true, union_all, update, values,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
+from server.models.user_model import User
 from server.models.user_status_model import UserStatus
-from server.schemas.user_statuses_schema import Status, UserStatusCreate, UserStatusUpdate
+from server.models.user_status_count_model import UserStatusCount
+from server.crud import roster_read_model, status_events
+from server.crud.status_events import StatusEvent
+from server.schemas.user_statuses_schema import BulkOutcome, Status, UserStatusCreate, UserStatusUpdate
+from server.sql_db.db import async_variant
+
+
+class StatusWrite(NamedTuple):
+    user_id: int
+    status: str
+    updated_at: datetime
+    changed: bool  # False: the same status was already stored, nothing was written
+
+
+def _status_value(status) -> str:
+    return status.value if isinstance(status, Status) else str(status)
+
+
+def _written_or_current(written, user_id: int):
+    """
+    One statement for "write, or tell me what is already there":
+    rows RETURNING from the DML CTE (changed=true), else the unchanged current row (changed=false).
+    The current-row branch sees the pre-statement snapshot, so it only matters when nothing was written.
+    """
+    return union_all(
+        select(written.c.user_id, written.c.status, written.c.updated_at, true().label("changed")),
+        select(UserStatus.user_id, UserStatus.status, UserStatus.updated_at, false().label("changed"))
+        .where(UserStatus.user_id == user_id, ~exists(select(written.c.user_id))),
+    )
+
+
+def _emit_write(db, row: Optional[StatusWrite]) -> None:
+    if row is not None and row.changed:
+        # postgres backend: the user_statuses trigger already queued the NOTIFY for this commit
+        status_events.emit(db, StatusEvent.of(row.user_id, row.status, row.updated_at))
+
+
+def _patch_read_model(row: Optional[StatusWrite]) -> Optional[StatusWrite]:
+    if row is not None and row.changed:
+        roster_read_model.on_status_written(row.user_id, row.status)
+    return row
+
+
+def _after_write(db: Session, row: Optional[StatusWrite]) -> Optional[StatusWrite]:
+    _emit_write(db, row)
+    db.commit()
+    return _patch_read_model(row)
+
+
+async def _after_write_async(db: AsyncSession, row: Optional[StatusWrite]) -> Optional[StatusWrite]:
+    _emit_write(db, row)
+    await db.commit()
+    return _patch_read_model(row)
+
+
+def _current_status_stmt(user_id: int):
+    return select(UserStatus.user_id, UserStatus.status, UserStatus.updated_at, false().label("changed")).where(
+        UserStatus.user_id == user_id
+    )
 
 
 # <------------------ UPSERT/CREATE -------------------->
-def upsert_user_status(db: Session, data: UserStatusCreate) -> UserStatus:
-    existing = db.get(UserStatus, data.user_id)
-    if existing:
-        existing.status = data.status
-        # updated_at is bumped by onupdate=func.now(); but we also protect in app side
-        existing.updated_at = datetime.now(timezone.utc)
-        db.commit()
-        db.refresh(existing)
-        return existing
-
-    row = UserStatus(
-        user_id=data.user_id,
-        status=data.status,
-    )
-    db.add(row)
+def _upsert_stmt(data: UserStatusCreate):
+    ins = pg_insert(UserStatus).values(user_id=data.user_id, status=_status_value(data.status))
+    written = ins.on_conflict_do_update(
+        index_elements=[UserStatus.user_id],
+        set_={"status": ins.excluded.status, "updated_at": func.now()},
+        where=UserStatus.status.is_distinct_from(ins.excluded.status),
+    ).returning(UserStatus.user_id, UserStatus.status, UserStatus.updated_at).cte("written")
+    return _written_or_current(written, data.user_id)
+
+
+def upsert_user_status(db: Session, data: UserStatusCreate) -> StatusWrite:
+    """Single round-trip: INSERT ... ON CONFLICT DO UPDATE (only if the status differs) ... RETURNING."""
+    row = db.execute(_upsert_stmt(data)).first()
+    if row is None:
+        # a concurrent insert of the same status committed after this statement's snapshot: the
+        # conflict skipped our write, but the current-row branch could not see that row yet
+        row = db.execute(_current_status_stmt(data.user_id)).one()
+    return _after_write(db, StatusWrite(*row))
+
+
+@async_variant(upsert_user_status)
+async def upsert_user_status_async(db: AsyncSession, data: UserStatusCreate) -> StatusWrite:
+    row = (await db.execute(_upsert_stmt(data))).first()
+    if row is None:  # see upsert_user_status
+        row = (await db.execute(_current_status_stmt(data.user_id))).one()
+    return await _after_write_async(db, StatusWrite(*row))
+
+
+class BulkStatusResult(NamedTuple):
+    user_id: int
+    status: str
+    outcome: BulkOutcome
+    updated_at: Optional[datetime]
+
+
+def bulk_upsert_user_statuses(db: Session, items: Sequence[Tuple[int, str]]) -> List[BulkStatusResult]:
+    """
+    Apply many (user_id, status) pairs with ONE statement:
+
+        WITH v AS (VALUES ...),
+             ins AS (INSERT INTO user_statuses SELECT ... FROM v, users WHERE users.id = v.user_id
+                     ON CONFLICT (user_id) DO UPDATE ... WHERE status IS DISTINCT FROM excluded.status
+                     RETURNING ..., xmax = 0 AS inserted)
+        SELECT per-input outcome FROM v LEFT JOIN ins / users / user_statuses
+
+    Unknown users are skipped (no FK error for the whole batch) and same-status rows are not
+    rewritten. Duplicate user_ids: the last one wins, earlier ones report `superseded`.
+    Results are returned in input order.
+    """
+    last_index: Dict[int, int] = {}
+    for i, (user_id, _status) in enumerate(items):
+        last_index[user_id] = i
+    effective = [(uid, _status_value(st)) for i, (uid, st) in enumerate(items) if last_index[uid] == i]
+    if not effective:
+        return []
+
+    v = (
+        values(column("user_id", BigInteger), column("status", Text), name="v")
+        .data(effective)
+        .cte("v")
+    )
+    ins = pg_insert(UserStatus).from_select(
+        ["user_id", "status"],
+        select(v.c.user_id, v.c.status).where(User.id == v.c.user_id),
+    )
+    ins = ins.on_conflict_do_update(
+        index_elements=[UserStatus.user_id],
+        set_={"status": ins.excluded.status, "updated_at": func.now()},
+        where=UserStatus.status.is_distinct_from(ins.excluded.status),
+    ).returning(
+        UserStatus.user_id,
+        UserStatus.status,
+        UserStatus.updated_at,
+        literal_column("xmax = 0").label("inserted"),
+    ).cte("ins")
+    cur = select(UserStatus).subquery("cur")  # pre-statement snapshot (CTE writes are invisible here)
+    stmt = (
+        select(
+            v.c.user_id,
+            v.c.status,
+            ins.c.inserted,
+            func.coalesce(ins.c.updated_at, cur.c.updated_at).label("updated_at"),
+            User.id.is_not(None).label("user_exists"),
+        )
+        .select_from(v)
+        .outerjoin(ins, ins.c.user_id == v.c.user_id)
+        .outerjoin(User, User.id == v.c.user_id)
+        .outerjoin(cur, cur.c.user_id == v.c.user_id)
+    )
+    by_user: Dict[int, BulkStatusResult] = {}
+    for row in db.execute(stmt):
+        if row.inserted is not None:
+            outcome = BulkOutcome.created if row.inserted else BulkOutcome.updated
+        elif row.user_exists:
+            outcome = BulkOutcome.unchanged
+        else:
+            outcome = BulkOutcome.user_not_found
+        updated_at = row.updated_at if outcome is not BulkOutcome.user_not_found else None
+        by_user[row.user_id] = BulkStatusResult(row.user_id, row.status, outcome, updated_at)
+
+    changed = [r for r in by_user.values() if r.outcome in (BulkOutcome.created, BulkOutcome.updated)]
+    status_events.emit_many(db, [StatusEvent.of(r.user_id, r.status, r.updated_at) for r in changed])
     db.commit()
-    db.refresh(row)
-    return row
+    for r in changed:
+        roster_read_model.on_status_written(r.user_id, r.status)
+
+    return [
+        by_user[uid] if last_index[uid] == i else BulkStatusResult(uid, _status_value(st), BulkOutcome.superseded, None)
+        for i, (uid, st) in enumerate(items)
+    ]
 
 
 # <------------------ READ -------------------->
@@ -41,23 +196,96 @@ def list_user_statuses_by_status(db: Session, status: str, limit: int = 200, off
     return list(db.execute(stmt).scalars())
 
 
+def get_status_counts(db: Session) -> Dict[str, int]:
+    """Users per status from the trigger-maintained summary table; every Status key is present."""
+    counts = {s.value: 0 for s in Status}
+    for status, n in db.execute(select(UserStatusCount.status, UserStatusCount.n)):
+        counts[status] = int(n)
+    return counts
+
+
 # <------------------ UPDATE -------------------->
-def update_user_status(db: Session, user_id: int, status: Status) -> Optional[UserStatus]:
-    row = db.get(UserStatus, user_id)
-    if not row:
-        return None
-    row.status = status
-    row.updated_at = datetime.now(timezone.utc)
+def _update_stmt(user_id: int, status: Status):
+    value = _status_value(status)
+    written = (
+        update(UserStatus)
+        .where(UserStatus.user_id == user_id, UserStatus.status.is_distinct_from(value))
+        .values(status=value, updated_at=func.now())
+        .returning(UserStatus.user_id, UserStatus.status, UserStatus.updated_at)
+        .cte("written")
+    )
+    return _written_or_current(written, user_id)
+
+
+def update_user_status(db: Session, user_id: int, status: Status) -> Optional[StatusWrite]:
+    """Single round-trip UPDATE ... RETURNING; same status -> no new row version. None if no status row."""
+    row = db.execute(_update_stmt(user_id, status)).first()
+    return _after_write(db, StatusWrite(*row) if row else None)
+
+
+@async_variant(update_user_status)
+async def update_user_status_async(db: AsyncSession, user_id: int, status: Status) -> Optional[StatusWrite]:
+    row = (await db.execute(_update_stmt(user_id, status))).first()
+    return await _after_write_async(db, StatusWrite(*row) if row else None)
+
+
+def bulk_update_user_statuses(db: Session, items: Sequence[Tuple[int, str]]) -> Dict[int, Optional[StatusWrite]]:
+    """
+    update_user_status for many users in ONE statement and one commit (write-behind flushes):
+
+        WITH v AS (VALUES ...),
+             written AS (UPDATE user_statuses SET ... FROM v WHERE ... IS DISTINCT FROM ... RETURNING ...)
+        SELECT per-input row FROM v LEFT JOIN written / user_statuses
+
+    user_ids must be unique. Same contract per user as update_user_status: None when the user
+    has no status row, changed=False when the status was already stored.
+    """
+    if not items:
+        return {}
+    v = (
+        values(column("user_id", BigInteger), column("status", Text), name="v")
+        .data(sorted((uid, _status_value(st)) for uid, st in items))
+        .cte("v")
+    )
+    written = (
+        update(UserStatus)
+        .where(UserStatus.user_id == v.c.user_id, UserStatus.status.is_distinct_from(v.c.status))
+        .values(status=v.c.status, updated_at=func.now())
+        .returning(UserStatus.user_id, UserStatus.status, UserStatus.updated_at)
+        .cte("written")
+    )
+    cur = select(UserStatus).subquery("cur")  # pre-statement snapshot
+    stmt = (
+        select(
+            v.c.user_id,
+            func.coalesce(written.c.status, cur.c.status).label("status"),
+            func.coalesce(written.c.updated_at, cur.c.updated_at).label("updated_at"),
+            written.c.user_id.is_not(None).label("changed"),
+            cur.c.user_id.is_not(None).label("found"),
+        )
+        .select_from(v)
+        .outerjoin(written, written.c.user_id == v.c.user_id)
+        .outerjoin(cur, cur.c.user_id == v.c.user_id)
+    )
+    out: Dict[int, Optional[StatusWrite]] = {}
+    for row in db.execute(stmt):
+        out[row.user_id] = StatusWrite(row.user_id, row.status, row.updated_at, row.changed) if row.found else None
+
+    changed = [w for w in out.values() if w is not None and w.changed]
+    status_events.emit_many(db, [StatusEvent.of(w.user_id, w.status, w.updated_at) for w in changed])
     db.commit()
-    db.refresh(row)
-    return row
+    for w in changed:
+        roster_read_model.on_status_written(w.user_id, w.status)
+    return out
 
 
 # <------------------ DELETE -------------------->
 def delete_user_status(db: Session, user_id: int) -> bool:
-    row = db.get(UserStatus, user_id)
-    if not row:
-        return False
-    db.delete(row)
+    stmt = delete(UserStatus).where(UserStatus.user_id == user_id).returning(UserStatus.user_id)
+    deleted = db.execute(stmt).first() is not None
+    if deleted:
+        status_events.emit(db, StatusEvent.of(user_id, None))
     db.commit()
-    return True
+    if deleted:
+        roster_read_model.on_status_written(user_id, None)
+    return deleted
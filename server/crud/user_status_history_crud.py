@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import List, Optional
+from sqlalchemy.orm import Session
+from sqlalchemy import select, case, func
+
+from server.models.user_model import User
+from server.models.user_status_model import UserStatus
+from server.models.user_status_history_model import UserStatusHistory
+from server.crud.user_crud import UserWithStatus
+
+
+def _as_utc(dt: datetime) -> datetime:
+    # naive query-string timestamps are taken as UTC (changed_at is timestamptz)
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt
+
+
+# <------------------ READ -------------------->
+def list_users_with_statuses_at(
+    db: Session,
+    at: datetime,
+    status: Optional[str] = None,
+) -> List[UserWithStatus]:
+    """
+    Roster as it was at `at`: the current status, unless the user changed it after `at`, in which
+    case the previous_status of their FIRST change after `at` is what they had then.
+    Only history newer than `at` is read (partition pruning + BRIN on changed_at), so asking
+    about last week stays cheap however long the table grows.
+    """
+    at = _as_utc(at)
+    first_change_after = (
+        select(UserStatusHistory.user_id, UserStatusHistory.previous_status)
+        .where(UserStatusHistory.changed_at > at)
+        .order_by(UserStatusHistory.user_id, UserStatusHistory.changed_at, UserStatusHistory.id)
+        .distinct(UserStatusHistory.user_id)
+        .subquery("h")
+    )
+    status_at = case(
+        (first_change_after.c.user_id.is_not(None), first_change_after.c.previous_status),
+        else_=UserStatus.status,
+    ).label("status")
+
+    snapshot = (
+        select(User.id, User.first_name, User.last_name, status_at)
+        .outerjoin(UserStatus, UserStatus.user_id == User.id)
+        .outerjoin(first_change_after, first_change_after.c.user_id == User.id)
+        .subquery("snap")
+    )
+    stmt = select(snapshot).order_by(snapshot.c.first_name, snapshot.c.last_name, snapshot.c.id)
+    if status is not None:
+        stmt = stmt.where(snapshot.c.status == status)
+
+    return [
+        UserWithStatus(id=row.id, first_name=row.first_name, last_name=row.last_name, status=row.status)
+        for row in db.execute(stmt)
+    ]
+
+
+def get_user_status_timeline(
+    db: Session,
+    user_id: int,
+    start: datetime,
+    end: datetime,
+    limit: int = 500,
+) -> List[UserStatusHistory]:
+    """Changes for one user with start <= changed_at < end, oldest first."""
+    start, end = _as_utc(start), _as_utc(end)
+    stmt = (
+        select(UserStatusHistory)
+        .where(
+            UserStatusHistory.user_id == user_id,
+            UserStatusHistory.changed_at >= start,
+            UserStatusHistory.changed_at < end,
+        )
+        .order_by(UserStatusHistory.changed_at, UserStatusHistory.id)
+        .limit(limit)
+    )
+    return list(db.scalars(stmt))
+
+
+# <------------------ MAINTENANCE -------------------->
+def ensure_partitions(db: Session, months_ahead: int) -> None:
+    """Creates the missing monthly partitions up to `months_ahead` (see schema.sql)."""
+    db.execute(select(func.ensure_user_status_history_partitions(months_ahead)))
+    db.commit()
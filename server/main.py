@@ -1,13 +1,38 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from server.routers.user_api import router as users_router
 from server.routers.user_status_api import router as users_statuses_router
 from server.routers.auth import router as auth_router
+from server.routers.team_api import router as teams_router
+from server.routers.metrics_api import router as metrics_router
+from server.metrics import METRICS_ENABLED, MetricsMiddleware
+from server.compression import CompressionMiddleware
+from server.crud import roster_read_model, status_events, status_scheduler, status_write_behind
+from server.sql_db import replicas
+
 
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    await status_events.start()   # one LISTEN connection per process
+    await replicas.start()        # no-op without DATABASE_REPLICA_URLS
+    await roster_read_model.start()
+    await status_scheduler.start()  # SKIP LOCKED claims: safe in every worker
+    await status_write_behind.start()  # no-op unless STATUS_WRITE_BEHIND=true
+    try:
+        yield
+    finally:
+        await status_write_behind.stop()  # flushes what is still queued
+        await status_scheduler.stop()
+        await roster_read_model.stop()
+        await replicas.stop()
+        await status_events.stop()
 
 
 app = FastAPI(
     title="Team Availability",
+    lifespan=lifespan,
     docs_url=None,      # disables /docs (Swagger UI)
     redoc_url=None,     # disables /redoc
     openapi_url=None,   # disables /openapi.json
@@ -26,6 +51,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# gzip/brotli above COMPRESSION_MIN_BYTES; skips bodies that are already encoded (cached roster)
+app.add_middleware(CompressionMiddleware)
+
+# outermost: times the whole request including CORS handling and compression
+app.add_middleware(MetricsMiddleware)
+
 app.include_router(auth_router)
 app.include_router(users_router)
 app.include_router(users_statuses_router)
+app.include_router(teams_router)
+if METRICS_ENABLED:
+    app.include_router(metrics_router)
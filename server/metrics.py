@@ -0,0 +1,221 @@
+"""
+Prometheus metrics (served at /metrics, see routers/metrics_api.py).
+
+- http_request_duration_seconds{method,route,status}: pure-ASGI middleware; `route` is the
+  matched path template, so cardinality is bounded by the route table.
+- db_query_duration_seconds{verb}: engine before/after_cursor_execute timing.
+- db_pool_checkout_wait_seconds{engine}: time spent waiting for a pooled connection
+  (pool classes below), plus pool size/checked-out/overflow gauges read at scrape time.
+- bcrypt_seconds{op} / hash_pool_wait_seconds: observed in the hashing pool workers.
+- login_throttled_total{scope}: logins refused with 429 (per-IP or per-email bucket).
+- single_flight_callers{flight}: callers per coalesced roster / user-status query.
+- status_write_behind_{batch_size,flush_seconds,wait_seconds}: write-behind batches (opt-in).
+- scheduled_status_transitions_total{transition}: started / ended / skipped scheduled ranges.
+- principal cache, roster read model/body cache, status stream and hashing pool state, read at scrape time.
+
+Every hot-path hook is one perf_counter() pair and a histogram observe. METRICS_ENABLED=false
+turns all of it off. Values are per process; with several uvicorn workers scrape each one
+(or run prometheus_client in multiprocess mode).
+"""
+from __future__ import annotations
+import os
+import time
+from typing import Iterable
+
+from prometheus_client import Counter, Gauge, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, REGISTRY
+from prometheus_client.registry import Collector
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+METRICS_ENABLED = (os.getenv("METRICS_ENABLED") or "true").strip().lower() in {"1", "true", "yes", "on"}
+# /metrics wants "Authorization: Bearer <METRICS_TOKEN>"; unset, the route answers 404
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+_DB_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ["method", "route", "status"],
+    buckets=_LATENCY_BUCKETS,
+)
+HTTP_IN_PROGRESS = Gauge("http_requests_in_progress", "HTTP requests being served")
+DB_QUERY = Histogram(
+    "db_query_duration_seconds", "Statement execution time (cursor.execute)", ["verb"], buckets=_DB_BUCKETS,
+)
+DB_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds", "Time waiting for a pooled connection", ["engine"], buckets=_DB_BUCKETS,
+)
+BCRYPT = Histogram("bcrypt_seconds", "bcrypt hash/verify time", ["op"], buckets=_LATENCY_BUCKETS)
+HASH_POOL_WAIT = Histogram(
+    "hash_pool_wait_seconds", "Time a bcrypt job queued before a worker picked it up", buckets=_LATENCY_BUCKETS,
+)
+LOGIN_THROTTLED = Counter("login_throttled", "Logins refused by rate limiting before any DB/bcrypt work", ["scope"])
+SINGLE_FLIGHT_CALLERS = Histogram(
+    "single_flight_callers", "Callers served by one coalesced call (1 = nothing shared)", ["flight"],
+    buckets=(1, 2, 3, 5, 10, 25, 50, 100, 250, 500, 1000),
+)
+WRITE_BEHIND_BATCH = Histogram(
+    "status_write_behind_batch_size", "Status updates per write-behind flush",
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500, 1000),
+)
+WRITE_BEHIND_FLUSH = Histogram(
+    "status_write_behind_flush_seconds", "Write-behind flush time (statement + commit)", buckets=_DB_BUCKETS,
+)
+WRITE_BEHIND_WAIT = Histogram(
+    "status_write_behind_wait_seconds", "Enqueue to commit, per status update", buckets=_LATENCY_BUCKETS,
+)
+SCHEDULED_STATUS_TRANSITIONS = Counter(
+    "scheduled_status_transitions", "Scheduled status ranges processed by the scheduler", ["transition"],
+)
+DB_READ_ROUTE = Counter("db_read_route", "Read-only requests by database target", ["target"])
+DB_QUERY_ERRORS = Counter("db_query_errors_total", "Statements that raised", ["verb"])
+
+
+# <------------------ HTTP -------------------->
+class MetricsMiddleware:
+    """Pure ASGI (no BaseHTTPMiddleware): no extra task or body buffering per request."""
+
+    def __init__(self, app, skip_paths: Iterable[str] = ("/metrics",)):
+        self.app = app
+        self.skip_paths = frozenset(skip_paths)
+
+    async def __call__(self, scope, receive, send):
+        if not METRICS_ENABLED or scope["type"] != "http" or scope["path"] in self.skip_paths:
+            return await self.app(scope, receive, send)
+
+        status_code = 500  # app raised before sending headers
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_IN_PROGRESS.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_PROGRESS.dec()
+            route = scope.get("route")  # set by FastAPI routing on the shared scope
+            HTTP_LATENCY.labels(
+                scope["method"], getattr(route, "path", "unmatched"), str(status_code)
+            ).observe(time.perf_counter() - start)
+
+
+# <------------------ DB -------------------->
+def _verb(statement: str) -> str:
+    head = statement[:16].lstrip().split(None, 1)
+    return head[0].upper() if head else "OTHER"
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Per-statement timing on a sync Engine (pass async_engine.sync_engine for the async one)."""
+    if not METRICS_ENABLED:
+        return
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._metrics_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        start = getattr(context, "_metrics_start", None)
+        if start is not None:
+            DB_QUERY.labels(_verb(statement)).observe(time.perf_counter() - start)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(ctx):
+        if ctx.statement:
+            DB_QUERY_ERRORS.labels(_verb(ctx.statement)).inc()
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited (SQLAlchemy has no pre-checkout event)."""
+    metrics_label = "sync"
+
+    def _do_get(self):
+        if not METRICS_ENABLED:
+            return super()._do_get()
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_CHECKOUT_WAIT.labels(self.metrics_label).observe(time.perf_counter() - start)
+
+
+class TimedAsyncQueuePool(TimedQueuePool, AsyncAdaptedQueuePool):
+    metrics_label = "async"
+
+
+# <------------------ SCRAPE-TIME STATE -------------------->
+class _StateCollector(Collector):
+    """Reads counters the app already keeps; nothing is added to the request path."""
+
+    def describe(self):
+        return []  # don't let register() call collect() while server.sql_db.db is still importing
+
+    def collect(self):
+        from server.sql_db.db import async_engine, engine
+        from server.crud import principal_cache, roster_read_model, single_flight, status_events, status_write_behind
+        from server.crud.hashing import hash_pool
+        from server.compression import roster_body_cache
+
+        size = GaugeMetricFamily("db_pool_size", "Configured pool size", labels=["engine"])
+        out = GaugeMetricFamily("db_pool_checked_out", "Connections checked out", labels=["engine"])
+        overflow = GaugeMetricFamily("db_pool_overflow", "Connections beyond pool_size", labels=["engine"])
+        for label, pool in (("sync", engine.pool), ("async", async_engine.sync_engine.pool)):
+            if isinstance(pool, QueuePool):
+                size.add_metric([label], pool.size())
+                out.add_metric([label], pool.checkedout())
+                overflow.add_metric([label], max(pool.overflow(), 0))
+        yield size
+        yield out
+        yield overflow
+
+        from server.sql_db.replicas import replicas
+        if replicas:
+            lag = GaugeMetricFamily("db_replica_lag_seconds", "Last measured replica lag (-1 = unreachable)", labels=["replica"])
+            for r in replicas:
+                lag.add_metric([r.name], -1 if r.lag_seconds is None else r.lag_seconds)
+            yield lag
+
+        hits = CounterMetricFamily("principal_cache_hits", "Principal cache hits", labels=["cache"])
+        misses = CounterMetricFamily("principal_cache_misses", "Principal cache misses", labels=["cache"])
+        entries = GaugeMetricFamily("principal_cache_entries", "Principal cache entries", labels=["cache"])
+        for name, s in principal_cache.stats().items():
+            hits.add_metric([name], s["hits"])
+            misses.add_metric([name], s["misses"])
+            entries.add_metric([name], s["size"])
+        yield hits
+        yield misses
+        yield entries
+
+        rm = roster_read_model.model
+        yield GaugeMetricFamily("roster_read_model_users", "Users held by the roster read model", value=len(rm._by_id))
+        yield GaugeMetricFamily("roster_read_model_stale", "1 while serving a snapshot the DB could not confirm", value=int(rm.stale))
+        yield GaugeMetricFamily("status_stream_subscribers", "Open status event streams", value=status_events.hub.subscriber_count)
+
+        body = roster_body_cache.stats()
+        yield CounterMetricFamily("roster_body_cache_hits", "Roster responses served from cached bytes", value=body["hits"])
+        yield CounterMetricFamily("roster_body_cache_misses", "Roster responses serialized (and compressed)", value=body["misses"])
+        yield GaugeMetricFamily("roster_body_cache_bytes", "Bytes held by the roster body cache", value=body["bytes"])
+
+        flights = GaugeMetricFamily("single_flight_in_flight", "Coalesced calls currently running", labels=["flight"])
+        for name, n in single_flight.stats().items():
+            flights.add_metric([name], n)
+        yield flights
+        yield GaugeMetricFamily(
+            "status_write_behind_pending", "Status updates waiting for a write-behind flush",
+            value=status_write_behind.queue.depth,
+        )
+
+        yield GaugeMetricFamily("hash_pool_pending", "bcrypt jobs queued or running", value=hash_pool.pending)
+        yield CounterMetricFamily("hash_pool_rejected", "bcrypt jobs refused by admission control", value=hash_pool.rejected)
+
+
+if METRICS_ENABLED:
+    REGISTRY.register(_StateCollector())
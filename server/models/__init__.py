@@ -1,17 +1,27 @@
+from typing import Dict, Tuple
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.inspection import inspect
 from datetime import datetime
 
+# model class -> its column attribute keys (mapper inspection once per class, not per object)
+_COLUMN_KEYS: Dict[type, Tuple[str, ...]] = {}
+
 class BaseModel:
+    @classmethod
+    def _column_keys(cls) -> Tuple[str, ...]:
+        keys = _COLUMN_KEYS.get(cls)
+        if keys is None:
+            keys = _COLUMN_KEYS[cls] = tuple(c.key for c in inspect(cls).column_attrs)
+        return keys
+
     def to_dict(self):
         result = {}
-        for c in inspect(self).mapper.column_attrs:
-            value = getattr(self, c.key)
+        for key in self._column_keys():
+            value = getattr(self, key)
             if isinstance(value, datetime):
-                result[c.key] = value.isoformat()
+                result[key] = value.isoformat()
             else:
-                result[c.key] = value
+                result[key] = value
         return result
 
 Base = declarative_base(cls=BaseModel)
-
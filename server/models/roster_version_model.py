@@ -0,0 +1,14 @@
+from __future__ import annotations
+
+from sqlalchemy import Column, Text
+from sqlalchemy.types import BigInteger
+
+from . import Base
+
+
+class RosterVersion(Base):
+    """Maintained by DB triggers (see schema.sql); read-only from the app."""
+    __tablename__ = "roster_versions"
+
+    scope = Column(Text, primary_key=True)  # 'all' = company-wide roster
+    version = Column(BigInteger, nullable=False, default=0)
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+from sqlalchemy import Column, DateTime, ForeignKey, Text, func
+from sqlalchemy.types import BigInteger
+
+from . import Base
+
+
+class ScheduledStatus(Base):
+    """A status range planned in advance; transitions are applied by crud/status_scheduler.py."""
+    __tablename__ = "scheduled_statuses"
+
+    id = Column(BigInteger, primary_key=True)
+    user_id = Column(BigInteger, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    status = Column(Text, nullable=False)
+    starts_at = Column(DateTime(timezone=True), nullable=False)
+    ends_at = Column(DateTime(timezone=True), nullable=True)        # None = status stays
+    previous_status = Column(Text, nullable=True)                   # set when the range starts
+    state = Column(Text, nullable=False, server_default="pending")  # pending | active | done | cancelled
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+from sqlalchemy import Column, Text, ForeignKey
+from sqlalchemy.types import BigInteger
+
+from . import Base
+
+
+class Team(Base):
+    __tablename__ = "teams"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    name = Column(Text, nullable=False, unique=True)
+
+
+class TeamMember(Base):
+    __tablename__ = "team_members"
+
+    team_id = Column(BigInteger, ForeignKey("teams.id", ondelete="CASCADE"), primary_key=True)
+    user_id = Column(BigInteger, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
@@ -0,0 +1,14 @@
+from __future__ import annotations
+
+from sqlalchemy import Column, Text
+from sqlalchemy.types import BigInteger
+
+from . import Base
+
+
+class UserStatusCount(Base):
+    """Maintained by DB triggers (see schema.sql); read-only from the app."""
+    __tablename__ = "user_status_counts"
+
+    status = Column(Text, primary_key=True)
+    n = Column(BigInteger, nullable=False, default=0)
@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+from sqlalchemy import Column, Text, DateTime
+from sqlalchemy.types import BigInteger
+
+from . import Base
+
+
+class UserStatusHistory(Base):
+    """Append-only; rows are written by the user_statuses trigger (see schema.sql), never by the app."""
+    __tablename__ = "user_status_history"
+
+    id = Column(BigInteger, primary_key=True)
+    changed_at = Column(DateTime(timezone=True), primary_key=True)  # partition key
+    user_id = Column(BigInteger, nullable=False)
+    status = Column(Text, nullable=True)            # None = status row deleted
+    previous_status = Column(Text, nullable=True)   # None = no status before
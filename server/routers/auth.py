@@ -1,16 +1,17 @@
 from __future__ import annotations
+import math
 import os
 from typing import Literal, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Response, Request
 from pydantic import BaseModel, EmailStr
-from sqlalchemy.orm import Session
 
-from server.sql_db.db import get_db
-from server.crud import user_crud
+from server.sql_db.db import DbSession, get_db, run_db
+from server.crud import rate_limit, user_crud
 from server.schemas.user_schema import UserPublic
-from server.crud.hashing import verify_password
+from server.crud.hashing import HashingPoolSaturated, verify_password_async
 from server.crud.cookies import encrypt_cookie  # decrypt not needed for logout
+from server import metrics
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
@@ -49,10 +50,48 @@ class LoginPayload(BaseModel):
 
 # ---------- Routes ----------
 
+def _throttled(retry_after: float, scope: str) -> HTTPException:
+    metrics.LOGIN_THROTTLED.labels(scope).inc()
+    return HTTPException(
+        status_code=429,
+        detail="Too many login attempts, please retry later",
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
 @router.post("/login", response_model=UserPublic, summary="Login & set auth cookie")
-def login(payload: LoginPayload, response: Response, db: Session = Depends(get_db)):
-    user = user_crud.get_user_by_email(db, str(payload.email))
-    if not user or not verify_password(payload.password, user.password or ""):
+async def login(payload: LoginPayload, request: Request, response: Response, db: DbSession = Depends(get_db)):
+    # throttle before the DB lookup and bcrypt: a stuffing burst costs us a dict lookup, not a core
+    ip = rate_limit.client_ip(request.headers, request.client.host if request.client else None)
+    email_key = rate_limit.email_key(str(payload.email))
+    if rate_limit.LOGIN_IP_LIMIT.enabled:
+        wait = await rate_limit.store.take(rate_limit.ip_key(ip), rate_limit.LOGIN_IP_LIMIT)
+        if wait:
+            raise _throttled(wait, "ip")
+    # the email token is spent before bcrypt, so concurrent attempts on one address are capped
+    # too; it is given back unless the password turns out wrong
+    email_limited = rate_limit.LOGIN_EMAIL_LIMIT.enabled
+    if email_limited:
+        wait = await rate_limit.store.take(email_key, rate_limit.LOGIN_EMAIL_LIMIT)
+        if wait:
+            raise _throttled(wait, "email")
+
+    wrong_password = False
+    try:
+        user = await run_db(db, user_crud.get_user_by_email, str(payload.email))
+        # bcrypt runs in the bounded hashing pool; when it is full, fail fast instead of queueing
+        try:
+            ok = bool(user) and await verify_password_async(payload.password, user.password or "")
+        except HashingPoolSaturated:
+            raise HTTPException(
+                status_code=503,
+                detail="Too many logins in progress, please retry",
+                headers={"Retry-After": "1"},
+            )
+        wrong_password = not ok
+    finally:
+        if email_limited and not wrong_password:
+            await rate_limit.store.refund(email_key, rate_limit.LOGIN_EMAIL_LIMIT)
+    if wrong_password:
         raise HTTPException(status_code=401, detail="Invalid email or password")
 
     token = encrypt_cookie({"user_id": user.id})
@@ -71,7 +110,7 @@ def login(payload: LoginPayload, response: Response, db: Session = Depends(get_d
     return user
 
 @router.post("/logout", summary="Logout & clear auth cookie")
-def logout(_request: Request, response: Response):
+async def logout(_request: Request, response: Response):
     cfg = _cookie_settings()
     
     response.delete_cookie(
@@ -0,0 +1,26 @@
+from __future__ import annotations
+from typing import Optional, Union
+
+from fastapi import Response
+
+# Clients must revalidate every time; the 304 path is what makes that cheap.
+CACHE_CONTROL = "private, no-cache"
+
+
+def roster_etag(version: Union[int, str], scope: str = "all") -> str:
+    # weak: the same version may be served with different encodings/whitespace
+    return f'W/"roster-{scope}-{version}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = {t.strip() for t in if_none_match.split(",")}
+    if "*" in tags:
+        return True
+    bare = etag[2:] if etag.startswith("W/") else etag
+    return etag in tags or bare in tags or f"W/{bare}" in tags
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
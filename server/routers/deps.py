@@ -1,34 +1,67 @@
 from __future__ import annotations
+import hmac
 import os
+from typing import Optional
 
 from fastapi import Depends, HTTPException, Request, status
-from sqlalchemy.orm import Session
 
-from server.models.user_model import User
-from server.sql_db.db import get_db
-from server.crud import user_crud
+from server.sql_db.db import DbSession, run_db
+from server.sql_db.replicas import get_read_db
+from server.crud import principal_cache, user_crud
+from server.crud.user_crud import UserPrincipal
 from server.crud.cookies import decrypt_cookie  
 
 COOKIE_NAME = os.getenv("COOKIE_NAME", "auth")
+# Elevated callers for batch/HR endpoints: admin users by email, or jobs presenting the service token
+ADMIN_EMAILS = {e.strip() for e in os.getenv("ADMIN_EMAILS", "").split(",") if e.strip()}
+SERVICE_API_TOKEN = os.getenv("SERVICE_API_TOKEN", "")
+SERVICE_TOKEN_HEADER = "X-Service-Token"
 
-def get_current_user(request: Request, db: Session = Depends(get_db)):
+async def get_current_user(request: Request, db: DbSession = Depends(get_read_db)) -> UserPrincipal:
     token = request.cookies.get(COOKIE_NAME)
     if not token:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
-    try:
-        data = decrypt_cookie(token)  # {"user_id": int}
-        user_id = data.get("user_id")
-        if not isinstance(user_id, int):
-            raise ValueError("bad user_id")
-    except Exception:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Bad session")
-
-    user = user_crud.get_user_by_id(db, user_id)
-    if not user:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Session user not found")
+
+    user_id = principal_cache.token_cache.get(token)
+    if user_id is None:
+        try:
+            data = decrypt_cookie(token)  # {"user_id": int}
+            user_id = data.get("user_id")
+            if not isinstance(user_id, int):
+                raise ValueError("bad user_id")
+        except Exception:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Bad session")
+        principal_cache.token_cache.set(token, user_id)
+
+    user = principal_cache.user_cache.get(user_id)
+    if user is None:
+        epoch = principal_cache.user_cache.epoch
+        user = await run_db(db, user_crud.get_user_principal, user_id)
+        if not user:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Session user not found")
+        principal_cache.user_cache.set(user_id, user, epoch=epoch)
     return user
 
-def require_uid_match(user_id: int, current: User = Depends(get_current_user)) -> User:
+async def require_uid_match(user_id: int, current: UserPrincipal = Depends(get_current_user)) -> UserPrincipal:
     if user_id != current.id:
         raise HTTPException(status_code=403, detail="token/user mismatch")
     return current
+
+def is_admin(user: UserPrincipal) -> bool:
+    return user.email in ADMIN_EMAILS
+
+async def require_admin_or_service(request: Request, db: DbSession = Depends(get_read_db)) -> Optional[UserPrincipal]:
+    """
+    Allow a service job (X-Service-Token == SERVICE_API_TOKEN) or a logged-in admin (ADMIN_EMAILS).
+    Returns the admin principal, or None for a service caller.
+    """
+    token = request.headers.get(SERVICE_TOKEN_HEADER)
+    if token is not None:
+        if SERVICE_API_TOKEN and hmac.compare_digest(token.encode("utf-8"), SERVICE_API_TOKEN.encode("utf-8")):
+            return None
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Bad service token")
+
+    current = await get_current_user(request, db)
+    if not is_admin(current):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
+    return current
@@ -0,0 +1,34 @@
+"""
+Fast JSON path for large responses.
+
+Returning a Response from a route makes FastAPI skip response_model validation and its
+jsonable_encoder pass; rows go straight to bytes through orjson. Keep `response_model=` on
+the decorator anyway so the documented schema stays accurate.
+"""
+from __future__ import annotations
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+import orjson
+from fastapi import Response
+
+
+class ORJSONBytesResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return orjson.dumps(content)
+
+
+def json_response(content: Any, headers: Optional[Mapping[str, str]] = None, status_code: int = 200) -> Response:
+    return ORJSONBytesResponse(content, status_code=status_code, headers=dict(headers) if headers else None)
+
+
+def roster_users(rows: Iterable) -> List[Dict[str, Any]]:
+    """UserWithStatus rows -> UserNameStatus-shaped dicts (a literal per row beats _asdict())."""
+    return [{"id": r.id, "first_name": r.first_name, "last_name": r.last_name, "status": r.status} for r in rows]
+
+
+def roster_body(rows: Iterable, next_cursor: Optional[str] = None) -> bytes:
+    return orjson.dumps({"users": roster_users(rows), "next_cursor": next_cursor})
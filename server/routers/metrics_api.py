@@ -0,0 +1,32 @@
+from __future__ import annotations
+import hmac
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, generate_latest
+
+from server import metrics as app_metrics
+
+router = APIRouter(tags=["Metrics"])
+
+
+async def require_metrics_token(request: Request) -> None:
+    """
+    The app port is public: scrapers authenticate with a bearer token (Prometheus
+    `authorization: {credentials: ...}`). Without METRICS_TOKEN the route doesn't exist.
+    """
+    expected = app_metrics.METRICS_TOKEN
+    if not expected:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(token.encode("utf-8"), expected.encode("utf-8")):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Bad metrics token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+# ------------------ GET  -------------------
+@router.get("/metrics", include_in_schema=False, dependencies=[Depends(require_metrics_token)])
+async def metrics() -> Response:
+    return Response(generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,36 @@
+from __future__ import annotations
+import base64
+import json
+from typing import List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+
+from server.crud.user_crud import RosterCursor, UserWithStatus
+
+MAX_PAGE_SIZE = 1000
+
+
+def encode_cursor(row: UserWithStatus) -> str:
+    raw = json.dumps([row.first_name, row.last_name, row.id], separators=(",", ":"), ensure_ascii=False)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[RosterCursor]:
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        first_name, last_name, user_id = json.loads(raw.decode("utf-8"))
+        if not (isinstance(first_name, str) and isinstance(last_name, str) and isinstance(user_id, int)):
+            raise ValueError("bad cursor fields")
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return RosterCursor(first_name, last_name, user_id)
+
+
+def split_page(rows: Sequence[UserWithStatus], limit: Optional[int]) -> Tuple[List[UserWithStatus], Optional[str]]:
+    """`rows` was fetched with limit + 1; the extra row only tells us another page exists."""
+    if limit is None or len(rows) <= limit:
+        return list(rows), None
+    page = list(rows[:limit])
+    return page, encode_cursor(page[-1])
@@ -0,0 +1,49 @@
+from __future__ import annotations
+from typing import Awaitable, Callable, List, Optional
+
+from fastapi import Request, Response
+
+from server import compression
+from server.crud import single_flight
+from server.crud.user_crud import UserWithStatus
+from server.routers.conditional import CACHE_CONTROL, etag_matches, not_modified
+from server.routers.fast_json import json_response, roster_body
+from server.routers.pagination import split_page
+
+
+async def roster_page_response(
+    request: Request,
+    etag: str,
+    limit: Optional[int],
+    cursor: Optional[str],
+    status: Optional[str],
+    load_rows: Callable[[], Awaitable[List[UserWithStatus]]],
+) -> Response:
+    """
+    Shared tail of the roster endpoints (company-wide and per team):
+    304 on a matching If-None-Match, else the page body, serialized and compressed once per
+    (ETag, page, status filter, encoding); concurrent misses on the same key run `load_rows` once.
+    `load_rows` must fetch limit + 1 rows.
+    """
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+
+    encoding = compression.negotiate(request.headers.get("accept-encoding"))
+    cache_key = (etag, limit, cursor, status, encoding)
+    cached = compression.roster_body_cache.get(cache_key)
+    if cached is None:
+        async def build():
+            rows, next_cursor = split_page(await load_rows(), limit)
+            # rows -> JSON bytes directly; no per-user Pydantic objects or response_model re-validation
+            item = await compression.encode_body(roster_body(rows, next_cursor), encoding, cached=True)
+            compression.roster_body_cache.set(cache_key, item)
+            return item
+
+        # a new version invalidates every cached body at once: concurrent misses share one query
+        cached = await single_flight.roster.do(cache_key, build)
+
+    body, content_encoding = cached
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL, "Vary": "Accept-Encoding"}
+    if content_encoding:
+        headers["Content-Encoding"] = content_encoding
+    return json_response(body, headers=headers)
@@ -0,0 +1,174 @@
+from __future__ import annotations
+from typing import Annotated, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.exc import IntegrityError
+
+from server.crud import team_crud, user_crud
+from server.crud.user_crud import UserPrincipal
+from server.routers.conditional import roster_etag
+from server.routers.deps import get_current_user, require_admin_or_service, require_uid_match
+from server.routers.pagination import MAX_PAGE_SIZE, decode_cursor
+from server.routers.responses import load_responses
+from server.routers.roster_response import roster_page_response
+from server.routers.user_api import UsersNameStatusList
+from server.schemas.team_schema import TeamCreate, TeamMembersResult, TeamMembersUpdate, TeamPublic, TeamsList
+from server.schemas.user_statuses_schema import Status
+from server.sql_db.db import DbSession, get_db, run_db
+from server.sql_db.replicas import get_read_db, pin_reads_to_primary
+
+router = APIRouter(prefix="/teams", tags=["Teams"])
+
+team_responses = load_responses("team_responses.yaml")
+common_error_responses = load_responses("common_error_responses.yaml")
+
+
+# ------------------ GET  -------------------
+@router.get(
+    "/list_teams",
+    response_model=TeamsList,
+    summary="All teams (cookie auth)",
+    responses={401: common_error_responses[401]},
+)
+async def list_teams(
+    current: Annotated[UserPrincipal, Depends(get_current_user)],
+    db: Annotated[DbSession, Depends(get_read_db)],
+):
+    return {"items": await run_db(db, team_crud.list_teams)}
+
+
+@router.get(
+    "/list_team_users_with_statuses",
+    response_model=UsersNameStatusList,
+    summary="One team's roster (same paging/ETag contract as /users/list_users_with_statuses)",
+    responses={
+        304: {"description": "Team roster unchanged since the ETag sent in If-None-Match"},
+        401: common_error_responses[401],
+        403: common_error_responses[403],
+        404: team_responses.get("team_404", {}),
+    },
+)
+async def list_team_users_with_statuses(
+    request: Request,
+    team_id: Annotated[int, Query(ge=1)],
+    user_id: Annotated[int, Query(ge=1)],
+    current: Annotated[UserPrincipal, Depends(require_uid_match)],
+    db: Annotated[DbSession, Depends(get_read_db)],
+    limit: Annotated[Optional[int], Query(ge=1, le=MAX_PAGE_SIZE, description="page size; omit for the whole team")] = None,
+    cursor: Annotated[Optional[str], Query(description="next_cursor from the previous page")] = None,
+    status_filter: Annotated[Optional[Status], Query(alias="status", description="only users with this status")] = None,
+):
+    after = decode_cursor(cursor)
+    status = status_filter.value if status_filter else None
+    scope = team_crud.team_scope(team_id)
+
+    # team-scoped version: changes outside this team don't invalidate it
+    version = await run_db(db, user_crud.get_roster_version, scope)
+    if version == 0 and await run_db(db, team_crud.get_team, team_id) is None:
+        raise HTTPException(status_code=404, detail="Team not found")
+    etag = roster_etag(version, scope=scope)
+
+    async def load_rows():
+        return await run_db(
+            db,
+            team_crud.list_team_users_with_statuses,
+            team_id,
+            limit=None if limit is None else limit + 1,
+            after=after,
+            status=status,
+        )
+
+    return await roster_page_response(request, etag, limit, cursor, status, load_rows)
+
+
+# ------------------ ADMIN (admin / service) ------------------
+@router.post(
+    "/create_team",
+    response_model=TeamPublic,
+    status_code=201,
+    summary="Create a team",
+    dependencies=[Depends(pin_reads_to_primary)],
+    responses={
+        201: team_responses.get("create_team_201", {}),
+        401: common_error_responses[401],
+        403: common_error_responses[403],
+        409: team_responses.get("create_team_409", {}),
+        422: common_error_responses[422],
+    },
+)
+async def create_team(
+    payload: TeamCreate,
+    _caller: Annotated[Optional[UserPrincipal], Depends(require_admin_or_service)],
+    db: Annotated[DbSession, Depends(get_db)],
+):
+    try:
+        return await run_db(db, team_crud.create_team, payload)
+    except IntegrityError:
+        raise HTTPException(status_code=409, detail="Team name already exists")
+
+
+@router.put(
+    "/add_team_members",
+    response_model=TeamMembersResult,
+    summary="Add users to a team (unknown users and existing members are skipped)",
+    dependencies=[Depends(pin_reads_to_primary)],
+    responses={
+        200: team_responses.get("team_members_200", {}),
+        401: common_error_responses[401],
+        403: common_error_responses[403],
+        404: team_responses.get("team_404", {}),
+        422: common_error_responses[422],
+    },
+)
+async def add_team_members(
+    team_id: Annotated[int, Query(ge=1)],
+    payload: TeamMembersUpdate,
+    _caller: Annotated[Optional[UserPrincipal], Depends(require_admin_or_service)],
+    db: Annotated[DbSession, Depends(get_db)],
+):
+    if await run_db(db, team_crud.get_team, team_id) is None:
+        raise HTTPException(status_code=404, detail="Team not found")
+    added = await run_db(db, team_crud.add_team_members, team_id, payload.user_ids)
+    return {"team_id": team_id, "changed": added}
+
+
+@router.put(
+    "/remove_team_members",
+    response_model=TeamMembersResult,
+    summary="Remove users from a team",
+    dependencies=[Depends(pin_reads_to_primary)],
+    responses={
+        200: team_responses.get("team_members_200", {}),
+        401: common_error_responses[401],
+        403: common_error_responses[403],
+        422: common_error_responses[422],
+    },
+)
+async def remove_team_members(
+    team_id: Annotated[int, Query(ge=1)],
+    payload: TeamMembersUpdate,
+    _caller: Annotated[Optional[UserPrincipal], Depends(require_admin_or_service)],
+    db: Annotated[DbSession, Depends(get_db)],
+):
+    removed = await run_db(db, team_crud.remove_team_members, team_id, payload.user_ids)
+    return {"team_id": team_id, "changed": removed}
+
+
+@router.delete(
+    "/delete_team",
+    status_code=204,
+    summary="Delete a team (memberships go with it)",
+    dependencies=[Depends(pin_reads_to_primary)],
+    responses={
+        401: common_error_responses[401],
+        403: common_error_responses[403],
+        404: team_responses.get("team_404", {}),
+    },
+)
+async def delete_team(
+    team_id: Annotated[int, Query(ge=1)],
+    _caller: Annotated[Optional[UserPrincipal], Depends(require_admin_or_service)],
+    db: Annotated[DbSession, Depends(get_db)],
+):
+    if not await run_db(db, team_crud.delete_team, team_id):
+        raise HTTPException(status_code=404, detail="Team not found")
@@ -1,18 +1,25 @@
 from __future__ import annotations
 
+from datetime import datetime
 from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy import select
-from sqlalchemy.orm import Session
 from pydantic import BaseModel
 
-from server.routers.deps import get_current_user, require_uid_match
-from server.sql_db.db import get_db
+from server.routers.deps import get_current_user, require_admin_or_service, require_uid_match
+from server.sql_db.db import DbSession, release_db, run_db
+from server.sql_db.replicas import _pinned_to_primary, get_read_db, read_target
 from server.routers.responses import load_responses
-
-from server.crud import user_crud
-from server.models.user_model import User
+from server.routers.conditional import roster_etag
+from server.routers.pagination import MAX_PAGE_SIZE, decode_cursor
+from server.routers.fast_json import json_response, roster_body
+from server.routers.roster_response import roster_page_response
+from server.routers.export_stream import ExportFormat, export_response
+from server.schemas.user_statuses_schema import Status
+
+from server.crud import export_crud, roster_read_model, single_flight, user_crud, user_status_history_crud
+from server.crud.user_crud import UserPrincipal
 from server.models.user_status_model import UserStatus
 from server.crud.cookies import decrypt_cookie  # NEW
 
@@ -32,6 +39,7 @@ class UserNameStatus(BaseModel):
 
 class UsersNameStatusList(BaseModel):
     users: List[UserNameStatus]
+    next_cursor: Optional[str] = None  # pass back as ?cursor= for the next page; None = last page
 
 
 
@@ -39,15 +47,125 @@ class UsersNameStatusList(BaseModel):
 
 # ------------------ GET  -------------------
 
-@router.get("/list_users_with_statuses", response_model=UsersNameStatusList)
-def list_users_with_statuses(
+@router.get(
+    "/list_users_with_statuses",
+    response_model=UsersNameStatusList,
+    responses={304: {"description": "Roster unchanged since the ETag sent in If-None-Match"}},
+)
+async def list_users_with_statuses(
+    request: Request,
     user_id: int = Query(..., ge=1),
-    db: Session = Depends(get_db),
-    current: User = Depends(require_uid_match),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="page size; omit for the whole roster"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    status_filter: Optional[Status] = Query(None, alias="status", description="only users with this status"),
+    db: DbSession = Depends(get_read_db),
+    current: UserPrincipal = Depends(require_uid_match),
 ):
-    rows = user_crud.list_all_users_with_statuses(db)
-    items = [UserNameStatus(id=r.id, first_name=r.first_name, last_name=r.last_name, status=r.status) for r in rows]
-    return {"users": items}
-
-
+    after = decode_cursor(cursor)
+    fetch = dict(
+        limit=None if limit is None else limit + 1,
+        after=after,
+        status=status_filter.value if status_filter else None,
+    )
+    from_memory = roster_read_model.serving()
+
+    # cheap version check first: unchanged roster -> 304 without the join or any models
+    if from_memory:
+        etag = roster_etag(roster_read_model.model.etag_version())
+    else:
+        etag = roster_etag(await run_db(db, user_crud.get_roster_version))
+
+    async def load_rows():
+        if from_memory:
+            return roster_read_model.model.page(**fetch)
+        return await run_db(db, user_crud.list_all_users_with_statuses, **fetch)
+
+    return await roster_page_response(request, etag, limit, cursor, fetch["status"], load_rows)
+
+
+@router.get(
+    "/get_user_with_status",
+    response_model=UserNameStatus,
+    summary="One colleague's name and current status",
+    responses={404: {"description": "No such user"}},
+)
+async def get_user_with_status(
+    request: Request,
+    user_id: int = Query(..., ge=1),
+    target_user_id: int = Query(..., ge=1, description="the user to look up"),
+    db: DbSession = Depends(get_read_db),
+    current: UserPrincipal = Depends(require_uid_match),
+):
+    def load():
+        return run_db(db, user_crud.get_user_status_by_id, target_user_id)
+
+    if _pinned_to_primary(request):
+        # read-your-writes: don't join a lookup that may have started before this client's write
+        row = await load()
+    else:
+        # identical concurrent lookups (e.g. many tabs polling the same person) share one query,
+        # per read target: a lagging replica's answer is not handed to primary readers
+        row = await single_flight.user_status.do((target_user_id, read_target(request)), load)
+    if row is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return row._asdict()
+
+
+@router.get(
+    "/list_users_with_statuses_at",
+    response_model=UsersNameStatusList,
+    summary="Roster as it was at a point in time (e.g. who was on vacation on a date)",
+)
+async def list_users_with_statuses_at(
+    user_id: int = Query(..., ge=1),
+    at: datetime = Query(..., description="ISO-8601 timestamp; naive values are UTC"),
+    status_filter: Optional[Status] = Query(None, alias="status", description="only users with this status at `at`"),
+    db: DbSession = Depends(get_read_db),
+    current: UserPrincipal = Depends(require_uid_match),
+):
+    rows = await run_db(
+        db,
+        user_status_history_crud.list_users_with_statuses_at,
+        at,
+        status_filter.value if status_filter else None,
+    )
+    return json_response(roster_body(rows))
+
+
+@router.get(
+    "/search_users",
+    response_model=UsersNameStatusList,
+    summary="Typeahead: users whose name or email matches `q` (prefix, substring or fuzzy)",
+)
+async def search_users(
+    user_id: int = Query(..., ge=1),
+    q: str = Query(..., min_length=1, max_length=100, description="name or email fragment"),
+    limit: int = Query(20, ge=1, le=user_crud.MAX_SEARCH_RESULTS),
+    db: DbSession = Depends(get_read_db),
+    current: UserPrincipal = Depends(require_uid_match),
+):
+    rows = await run_db(db, user_crud.search_users, q, limit)
+    return json_response(roster_body(rows))
+
+
+# ------------------ EXPORT (admin / service) -------------------
+@router.get(
+    "/export_users_with_statuses",
+    summary="All users with their current status as a CSV or NDJSON stream (admin or service token)",
+    responses={
+        200: {"description": "text/csv or application/x-ndjson, streamed", "content": {"text/csv": {}, "application/x-ndjson": {}}},
+        401: common_error_responses[401],
+        403: common_error_responses[403],
+    },
+)
+async def export_users_with_statuses(
+    fmt: ExportFormat = Query("csv", alias="format"),
+    status_filter: Optional[Status] = Query(None, alias="status", description="only users with this status"),
+    db: DbSession = Depends(get_read_db),
+    _caller: Optional[UserPrincipal] = Depends(require_admin_or_service),
+):
+    # auth is done; the stream reads through a session (and server-side cursor) of its own
+    await release_db(db)
+    stmt = export_crud.users_with_statuses_stmt(status_filter.value if status_filter else None)
+    return export_response(stmt, export_crud.USER_COLUMNS, fmt, "users_with_statuses")
 
@@ -1,19 +1,33 @@
 from __future__ import annotations
-from typing import Annotated
+from datetime import datetime, timezone
+from typing import Annotated, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
+from fastapi.responses import StreamingResponse
 
-from server.routers.deps import get_current_user, require_uid_match
+from server.routers.deps import get_current_user, is_admin, require_admin_or_service, require_uid_match
 from server.schemas.user_statuses_schema import (
+    MAX_TIMELINE_ITEMS,
+    ScheduledStatusCreate,
+    ScheduledStatusesList,
+    ScheduledStatusPublic,
     Status,
+    UserStatusBulkResults,
+    UserStatusBulkUpdate,
+    UserStatusCounts,
     UserStatusCreate,
     UserStatusPublic,
+    UserStatusTimeline,
 )
-from server.crud import user_status_crud
-from server.models.user_model import User
+from server.crud import (
+    export_crud, scheduled_status_crud, status_events, status_write_behind, user_status_crud, user_status_history_crud,
+)
+from server.crud.user_crud import UserPrincipal
+from server.crud.user_status_history_crud import _as_utc
 from server.routers.responses import load_responses
-from server.sql_db.db import get_db
+from server.routers.export_stream import ExportFormat, export_response
+from server.sql_db.db import DbSession, get_db, release_db, run_db
+from server.sql_db.replicas import get_read_db, pin_reads_to_primary
 
 router = APIRouter(prefix="/user_statuses", tags=["User Statuses"])
 
@@ -22,11 +36,11 @@ common_error_responses = load_responses("common_error_responses.yaml")
 
 
 # --- wrapper for payload-based UID (calls your existing require_uid_match) ---
-def require_uid_match_from_payload(
+async def require_uid_match_from_payload(
     payload: UserStatusCreate,
-    current: User = Depends(get_current_user),
-) -> User:
-    return require_uid_match(payload.user_id, current)
+    current: UserPrincipal = Depends(get_current_user),
+) -> UserPrincipal:
+    return await require_uid_match(payload.user_id, current)
 
 
 
@@ -34,6 +48,7 @@ def require_uid_match_from_payload(
 @router.put(
     "/update_current_user_status",
     response_model=UserStatusPublic,
+    dependencies=[Depends(pin_reads_to_primary)],
     summary="Update existing user status (self-only; cookie auth)",
     responses={
         200: status_responses.get("update_status_200", {}),
@@ -44,7 +59,7 @@ def require_uid_match_from_payload(
         500: common_error_responses[500],
     },
 )
-def update_current_user_status(
+async def update_current_user_status(
     user_id: Annotated[int, Query(..., ge=1, alias="user_id")],
     status: Annotated[
         Status,
@@ -55,11 +70,206 @@ def update_current_user_status(
         ),
     ],
     current: Annotated[
-        User, Depends(require_uid_match)
+        UserPrincipal, Depends(require_uid_match)
     ],  
-    db: Annotated[Session, Depends(get_db)],
+    db: Annotated[DbSession, Depends(get_db)],
 ):
-    row = user_status_crud.update_user_status(db, user_id, status)
+    if status_write_behind.STATUS_WRITE_BEHIND:
+        # batched with other updates into one statement/commit; answered after that commit
+        row = await status_write_behind.queue.submit(user_id, status)
+    else:
+        row = await run_db(db, user_status_crud.update_user_status, user_id, status)
     if not row:
         raise HTTPException(status_code=404, detail="Status not found")
     return row
+
+
+# ------------------ BULK (admin / service) ------------------
+@router.put(
+    "/bulk_update_statuses",
+    response_model=UserStatusBulkResults,
+    dependencies=[Depends(pin_reads_to_primary)],
+    summary="Set many users' statuses in one statement (admin or service token)",
+    responses={
+        200: status_responses.get("bulk_update_200", {}),
+        401: common_error_responses[401],
+        403: common_error_responses[403],
+        422: common_error_responses[422],
+        500: common_error_responses[500],
+    },
+)
+async def bulk_update_statuses(
+    payload: UserStatusBulkUpdate,
+    _caller: Annotated[Optional[UserPrincipal], Depends(require_admin_or_service)],
+    db: Annotated[DbSession, Depends(get_db)],
+):
+    pairs = [(item.user_id, item.status) for item in payload.items]
+    results = await run_db(db, user_status_crud.bulk_upsert_user_statuses, pairs)
+    return {"items": [r._asdict() for r in results]}
+
+
+# ------------------ SCHEDULED (self-only) ------------------
+@router.post(
+    "/schedule_status",
+    response_model=ScheduledStatusPublic,
+    status_code=201,
+    dependencies=[Depends(pin_reads_to_primary)],
+    summary="Plan a status for a future range, e.g. a vacation (self-only; cookie auth)",
+    responses={
+        201: status_responses.get("schedule_status_201", {}),
+        401: common_error_responses[401],
+        403: common_error_responses[403],
+        409: status_responses.get("schedule_status_409", {}),
+        422: common_error_responses[422],
+    },
+)
+async def schedule_status(
+    user_id: Annotated[int, Query(..., ge=1)],
+    payload: ScheduledStatusCreate,
+    current: Annotated[UserPrincipal, Depends(require_uid_match)],
+    db: Annotated[DbSession, Depends(get_db)],
+):
+    if payload.ends_at is not None and payload.ends_at <= datetime.now(timezone.utc):
+        raise HTTPException(status_code=422, detail="ends_at is in the past")
+    row = await run_db(db, scheduled_status_crud.create_scheduled_status, user_id, payload)
+    if row is None:
+        raise HTTPException(status_code=409, detail="Overlaps another scheduled status")
+    return row
+
+
+@router.get(
+    "/scheduled_statuses",
+    response_model=ScheduledStatusesList,
+    summary="Own upcoming and running scheduled statuses (self-only; cookie auth)",
+    responses={
+        200: status_responses.get("scheduled_statuses_200", {}),
+        401: common_error_responses[401],
+        403: common_error_responses[403],
+    },
+)
+async def list_scheduled_statuses(
+    user_id: Annotated[int, Query(..., ge=1)],
+    current: Annotated[UserPrincipal, Depends(require_uid_match)],
+    db: Annotated[DbSession, Depends(get_db)],
+    include_finished: Annotated[bool, Query(description="also done/cancelled, newest first")] = False,
+):
+    rows = await run_db(db, scheduled_status_crud.list_scheduled_statuses, user_id, include_finished)
+    return {"items": rows}
+
+
+@router.delete(
+    "/cancel_scheduled_status",
+    response_model=ScheduledStatusPublic,
+    dependencies=[Depends(pin_reads_to_primary)],
+    summary="Cancel a pending range, or end a running one now (self-only; cookie auth)",
+    responses={
+        401: common_error_responses[401],
+        403: common_error_responses[403],
+        404: status_responses.get("cancel_scheduled_status_404", {}),
+    },
+)
+async def cancel_scheduled_status(
+    user_id: Annotated[int, Query(..., ge=1)],
+    schedule_id: Annotated[int, Query(..., ge=1)],
+    current: Annotated[UserPrincipal, Depends(require_uid_match)],
+    db: Annotated[DbSession, Depends(get_db)],
+):
+    row = await run_db(db, scheduled_status_crud.cancel_scheduled_status, user_id, schedule_id)
+    if row is None:
+        raise HTTPException(status_code=404, detail="Scheduled status not found or already finished")
+    return row
+
+
+# ------------------ COUNTS ------------------
+@router.get(
+    "/status_counts",
+    response_model=UserStatusCounts,
+    summary="Number of users per status (cookie auth)",
+    responses={
+        200: status_responses.get("status_counts_200", {}),
+        401: common_error_responses[401],
+    },
+)
+async def status_counts(
+    current: Annotated[UserPrincipal, Depends(get_current_user)],
+    db: Annotated[DbSession, Depends(get_read_db)],
+):
+    counts = await run_db(db, user_status_crud.get_status_counts)
+    return {"counts": counts, "total": sum(counts.values())}
+
+
+# ------------------ HISTORY ------------------
+@router.get(
+    "/status_timeline",
+    response_model=UserStatusTimeline,
+    summary="A user's status changes within [start, end) (yourself, or anyone for admins; cookie auth)",
+    responses={
+        200: status_responses.get("status_timeline_200", {}),
+        401: common_error_responses[401],
+        403: common_error_responses[403],
+        422: common_error_responses[422],
+    },
+)
+async def status_timeline(
+    user_id: Annotated[int, Query(..., ge=1)],
+    target_user_id: Annotated[int, Query(..., ge=1, description="whose history; only your own unless you are an admin")],
+    start: Annotated[datetime, Query(..., description="inclusive; naive values are UTC")],
+    end: Annotated[datetime, Query(..., description="exclusive; naive values are UTC")],
+    current: Annotated[UserPrincipal, Depends(require_uid_match)],
+    db: Annotated[DbSession, Depends(get_read_db)],
+    limit: Annotated[int, Query(ge=1, le=MAX_TIMELINE_ITEMS)] = 500,
+):
+    # history is more than the roster shows (where someone was, and when): self or admin only
+    if target_user_id != current.id and not is_admin(current):
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    start, end = _as_utc(start), _as_utc(end)  # naive vs aware can't be compared
+    if end <= start:
+        raise HTTPException(status_code=422, detail="end must be after start")
+    rows = await run_db(db, user_status_history_crud.get_user_status_timeline, target_user_id, start, end, limit)
+    return {"user_id": target_user_id, "items": rows}
+
+
+@router.get(
+    "/export_status_history",
+    summary="Status changes within [start, end) as a CSV or NDJSON stream (admin or service token)",
+    responses={
+        200: {"description": "text/csv or application/x-ndjson, streamed", "content": {"text/csv": {}, "application/x-ndjson": {}}},
+        401: common_error_responses[401],
+        403: common_error_responses[403],
+        422: common_error_responses[422],
+    },
+)
+async def export_status_history(
+    start: Annotated[datetime, Query(..., description="inclusive; naive values are UTC")],
+    end: Annotated[datetime, Query(..., description="exclusive; naive values are UTC")],
+    _caller: Annotated[Optional[UserPrincipal], Depends(require_admin_or_service)],
+    db: Annotated[DbSession, Depends(get_read_db)],
+    fmt: Annotated[ExportFormat, Query(alias="format")] = "csv",
+):
+    start, end = _as_utc(start), _as_utc(end)  # naive vs aware can't be compared
+    if end <= start:
+        raise HTTPException(status_code=422, detail="end must be after start")
+    # auth is done; the stream reads through a session (and server-side cursor) of its own
+    await release_db(db)
+    stmt = export_crud.status_history_stmt(start, end)
+    return export_response(stmt, export_crud.HISTORY_COLUMNS, fmt, "status_history")
+
+
+# ------------------ PUSH (Server-Sent Events) ------------------
+@router.get(
+    "/stream",
+    summary="Live status changes (text/event-stream; cookie auth)",
+    responses={401: common_error_responses[401]},
+)
+async def stream_status_changes(
+    current: Annotated[UserPrincipal, Depends(get_current_user)],
+    db: Annotated[DbSession, Depends(get_read_db)],
+    team_id: Annotated[Optional[int], Query(ge=1, description="only this team's changes")] = None,
+):
+    # auth is done; don't pin a pooled connection for the lifetime of the stream
+    await release_db(db)
+    return StreamingResponse(
+        status_events.stream(team_id=team_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,33 @@
+from __future__ import annotations
+from typing import List
+from pydantic import Field, field_validator
+from server.schemas.base import AppModel
+
+MAX_MEMBERS_PER_REQUEST = 1000
+
+class TeamCreate(AppModel):
+    name: str = Field(min_length=1, max_length=100)
+
+    @field_validator("name", mode="before")
+    @classmethod
+    def _normalize_name(cls, v: str) -> str:
+        v = " ".join(str(v).split())
+        if not v:
+            raise ValueError("name cannot be empty")
+        return v
+
+class TeamPublic(AppModel):
+    id: int
+    name: str
+
+    model_config = {**AppModel.model_config, "from_attributes": True}
+
+class TeamsList(AppModel):
+    items: List[TeamPublic]
+
+class TeamMembersUpdate(AppModel):
+    user_ids: List[int] = Field(min_length=1, max_length=MAX_MEMBERS_PER_REQUEST)
+
+class TeamMembersResult(AppModel):
+    team_id: int
+    changed: int  # memberships actually added/removed (existing ones and unknown users are skipped)
@@ -1,7 +1,7 @@
 from __future__ import annotations
 from enum import Enum
-from typing import List
-from datetime import datetime
+from typing import Dict, List, Optional
+from datetime import datetime, timezone
 from pydantic import Field, field_validator
 from server.schemas.base import AppModel  
 
@@ -26,6 +26,8 @@ class UserStatusBase(AppModel):
     def _validate_status(cls, v):
         if v is None:
             raise ValueError("status is required")
+        if isinstance(v, Status):
+            return v.value  # str() of a str-Enum is "Status.x" on 3.11+, not its value
         s = str(v).strip().lower()
         if s not in _ALLOWED:
             allowed = ", ".join(sorted(_ALLOWED))
@@ -47,3 +49,87 @@ class UserStatusPublic(AppModel):
 
 class UserStatusesList(AppModel):
     items: List[UserStatusPublic]
+
+# ---------- Bulk ----------
+MAX_BULK_ITEMS = 1000
+
+class BulkOutcome(str, Enum):
+    created = "created"
+    updated = "updated"
+    unchanged = "unchanged"            # already had that status; no write
+    user_not_found = "user_not_found"
+    superseded = "superseded"          # same user_id appears later in the batch; last one wins
+
+class UserStatusBulkUpdate(AppModel):
+    items: List[UserStatusCreate] = Field(min_length=1, max_length=MAX_BULK_ITEMS)
+
+class UserStatusBulkResult(AppModel):
+    user_id: int
+    status: Status
+    outcome: BulkOutcome
+    updated_at: Optional[datetime] = None
+
+class UserStatusBulkResults(AppModel):
+    items: List[UserStatusBulkResult]
+
+# ---------- History ----------
+MAX_TIMELINE_ITEMS = 5000
+
+class UserStatusChange(AppModel):
+    status: Optional[Status] = None           # None = status removed
+    previous_status: Optional[Status] = None  # None = no status before
+    changed_at: datetime
+
+    model_config = {**AppModel.model_config, "from_attributes": True}
+
+class UserStatusTimeline(AppModel):
+    user_id: int
+    items: List[UserStatusChange]
+
+# ---------- Counts ----------
+class UserStatusCounts(AppModel):
+    counts: Dict[Status, int]
+    total: int
+
+# ---------- Scheduled ----------
+MAX_SCHEDULED_PER_USER = 100
+
+class ScheduleState(str, Enum):
+    pending = "pending"      # waiting for starts_at
+    active = "active"        # applied; previous_status is restored at ends_at
+    done = "done"
+    cancelled = "cancelled"
+
+class ScheduledStatusCreate(UserStatusBase):
+    starts_at: datetime = Field(description="naive values are UTC")
+    ends_at: Optional[datetime] = Field(default=None, description="omit to keep the status; naive values are UTC")
+
+    @field_validator("starts_at", "ends_at")
+    @classmethod
+    def _as_utc(cls, v: Optional[datetime]) -> Optional[datetime]:
+        if v is not None and v.tzinfo is None:
+            return v.replace(tzinfo=timezone.utc)
+        return v
+
+    @field_validator("ends_at")
+    @classmethod
+    def _ends_after_start(cls, v: Optional[datetime], info) -> Optional[datetime]:
+        start = info.data.get("starts_at")
+        if v is not None and start is not None and v <= start:
+            raise ValueError("ends_at must be after starts_at")
+        return v
+
+class ScheduledStatusPublic(AppModel):
+    id: int
+    user_id: int
+    status: Status
+    starts_at: datetime
+    ends_at: Optional[datetime] = None
+    previous_status: Optional[Status] = None
+    state: ScheduleState
+
+    model_config = {**AppModel.model_config, "from_attributes": True}
+
+class ScheduledStatusesList(AppModel):
+    items: List[ScheduledStatusPublic]
+
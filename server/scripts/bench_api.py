@@ -0,0 +1,250 @@
+"""
+Load test for the API hot paths: login, roster read, user search, status update.
+
+    # in-process (httpx ASGI transport, app lifespan included), local Postgres from DATABASE_URL
+    python -m server.scripts.bench_api --users 2000 --concurrency 32 --requests 2000
+
+    # against a running server (e.g. uvicorn server.main:app --workers 4)
+    python -m server.scripts.bench_api --base-url http://127.0.0.1:8000 --concurrency 64
+
+Seeds N synthetic users through import_users (idempotent, so re-runs skip hashing), then
+for every endpoint fires `--requests` calls from `--concurrency` logged-in clients and prints
+one JSON line per endpoint with throughput and p50/p95/p99. Each line carries the git commit
+and run settings; append them with `--out results.jsonl` to compare commits.
+
+All in-process clients share one address, so the per-IP login limit is disabled for the
+in-process run; against --base-url start the server with LOGIN_IP_RATE_PER_MINUTE=0.
+"""
+from __future__ import annotations
+from pathlib import Path
+import sys
+REPO_ROOT = Path(__file__).resolve().parents[2]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+import argparse
+import asyncio
+import contextlib
+import itertools
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from dotenv import load_dotenv
+import httpx
+
+PASSWORD = "Bench123!?"
+EMAIL_FMT = "bench.user{:06d}@example.com"
+STATUSES = ["working", "working_remotely", "on_vacation", "business_trip"]
+ENDPOINTS = ("login", "roster", "roster_304", "search", "status_update")
+
+
+def log_json(metrics: dict) -> None:
+    print(json.dumps(metrics, ensure_ascii=False))
+
+
+def git_revision() -> Dict[str, object]:
+    def git(*args: str) -> str:
+        return subprocess.run(["git", *args], cwd=REPO_ROOT, capture_output=True, text=True).stdout.strip()
+    return {"git_commit": git("rev-parse", "--short", "HEAD") or None, "git_dirty": bool(git("status", "--porcelain"))}
+
+
+# <------------------ SEED -------------------->
+def seed_users(n: int, workers: Optional[int]) -> dict:
+    from server.scripts.import_users import import_users
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bench_users.jsonl"
+        with path.open("w", encoding="utf-8") as f:
+            for i in range(n):
+                f.write(json.dumps({
+                    "email": EMAIL_FMT.format(i),
+                    "first_name": f"Bench{i:06d}",
+                    "last_name": "User",
+                    "status": STATUSES[i % len(STATUSES)],
+                    "password": PASSWORD,
+                }) + "\n")
+        return import_users(path, workers=workers)
+
+
+# <------------------ CLIENTS -------------------->
+class BenchClient:
+    def __init__(self, http: httpx.AsyncClient, anon: httpx.AsyncClient, email: str):
+        self.http = http
+        self.anon = anon  # for the login benchmark, so it doesn't replace this client's session cookie
+        self.email = email
+        self.user_id: Optional[int] = None
+        self.etag: Optional[str] = None
+
+    async def login(self) -> httpx.Response:
+        r = await self.http.post("/auth/login", json={"email": self.email, "password": PASSWORD})
+        if r.status_code == 200:
+            self.user_id = r.json()["id"]
+        return r
+
+
+async def _timed(fn: Callable[[], Awaitable[httpx.Response]], latencies: List[float], codes: Counter) -> None:
+    start = time.perf_counter()
+    try:
+        r = await fn()
+        codes[r.status_code] += 1
+    except httpx.HTTPError as e:
+        codes[e.__class__.__name__] += 1
+        return
+    latencies.append(time.perf_counter() - start)
+
+
+def _request_factory(endpoint: str, client: BenchClient, users: int) -> Callable[[], Awaitable[httpx.Response]]:
+    http = client.http
+    if endpoint == "login":
+        # accounts spread over the whole seed
+        def call():
+            return client.anon.post("/auth/login", json={"email": EMAIL_FMT.format(random.randrange(users)), "password": PASSWORD})
+        return call
+    if endpoint == "roster":
+        def call():
+            return http.get("/users/list_users_with_statuses", params={"user_id": client.user_id})
+        return call
+    if endpoint == "roster_304":
+        def call():
+            return http.get(
+                "/users/list_users_with_statuses",
+                params={"user_id": client.user_id},
+                headers={"If-None-Match": client.etag or ""},
+            )
+        return call
+    if endpoint == "search":
+        # typeahead: a prefix of a seeded first name, "be" .. "bench000123"
+        def call():
+            q = f"bench{random.randrange(users):06d}"[:random.randint(2, 11)]
+            return http.get("/users/search_users", params={"user_id": client.user_id, "q": q})
+        return call
+    if endpoint == "status_update":
+        cycle = itertools.cycle(STATUSES)
+        def call():
+            return http.put(
+                "/user_statuses/update_current_user_status",
+                params={"user_id": client.user_id, "status": next(cycle)},
+            )
+        return call
+    raise ValueError(f"unknown endpoint {endpoint!r}")
+
+
+async def bench_endpoint(endpoint: str, clients: List[BenchClient], requests: int, users: int) -> dict:
+    latencies: List[float] = []
+    codes: Counter = Counter()
+    per_client = [requests // len(clients) + (1 if i < requests % len(clients) else 0) for i in range(len(clients))]
+
+    async def worker(client: BenchClient, n: int) -> None:
+        call = _request_factory(endpoint, client, users)
+        for _ in range(n):
+            await _timed(call, latencies, codes)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(c, n) for c, n in zip(clients, per_client)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    def pct(p: float) -> float:
+        return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000, 3) if latencies else 0.0
+
+    ok = sum(n for code, n in codes.items() if isinstance(code, int) and code < 400)
+    return {
+        "endpoint": endpoint,
+        "requests": requests,
+        "ok": ok,
+        "errors": requests - ok,
+        "status_codes": {str(k): v for k, v in sorted(codes.items(), key=lambda kv: str(kv[0]))},
+        "duration_seconds": round(elapsed, 6),
+        "requests_per_second": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms_mean": round(statistics.fmean(latencies) * 1000, 3) if latencies else 0.0,
+        "latency_ms_p50": pct(0.50),
+        "latency_ms_p95": pct(0.95),
+        "latency_ms_p99": pct(0.99),
+    }
+
+
+@contextlib.asynccontextmanager
+async def _transport(base_url: Optional[str]):
+    if base_url:
+        yield None
+        return
+    from server.main import app
+    async with app.router.lifespan_context(app):
+        yield httpx.ASGITransport(app=app)
+
+
+async def run(args: argparse.Namespace) -> None:
+    endpoints = [e.strip() for e in args.endpoints.split(",") if e.strip()]
+    base_url = args.base_url or "http://bench.local"
+    run_info = {
+        **git_revision(),
+        "mode": "http" if args.base_url else "asgi",
+        "base_url": args.base_url or None,
+        "users": args.users,
+        "concurrency": args.concurrency,
+        "db_async": (os.getenv("DB_ASYNC") or "").strip().lower() in {"1", "true", "yes", "on"},
+        "python": platform.python_version(),
+    }
+    limits = httpx.Limits(max_connections=args.concurrency * 2, max_keepalive_connections=args.concurrency * 2)
+
+    async with _transport(args.base_url) as transport:
+        https = [
+            httpx.AsyncClient(transport=transport, base_url=base_url, limits=limits, timeout=args.timeout)
+            for _ in range(args.concurrency * 2)
+        ]
+        try:
+            clients = [
+                BenchClient(https[2 * i], https[2 * i + 1], EMAIL_FMT.format(i % args.users))
+                for i in range(args.concurrency)
+            ]
+            logins = await asyncio.gather(*(c.login() for c in clients))
+            if any(r.status_code != 200 for r in logins):
+                raise SystemExit(f"bench login failed: {Counter(r.status_code for r in logins)} (seeded?)")
+            first = await clients[0].http.get("/users/list_users_with_statuses", params={"user_id": clients[0].user_id})
+            for c in clients:
+                c.etag = first.headers.get("etag")
+
+            for endpoint in endpoints:
+                result = await bench_endpoint(endpoint, clients, args.requests, args.users)
+                ts = datetime.now(timezone.utc)
+                line = {"event": "bench_api", "ts": ts.isoformat(), **run_info, **result}
+                log_json(line)
+                if args.out:
+                    with open(args.out, "a", encoding="utf-8") as f:
+                        f.write(json.dumps(line, ensure_ascii=False) + "\n")
+        finally:
+            await asyncio.gather(*(h.aclose() for h in https))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="", help="benchmark a running server instead of the in-process app")
+    parser.add_argument("--users", type=int, default=1000, help="synthetic users to seed")
+    parser.add_argument("--skip-seed", action="store_true", help="users are already there")
+    parser.add_argument("--seed-workers", type=int, default=0, help="hashing processes for seeding (0 = CPU count)")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent logged-in clients")
+    parser.add_argument("--requests", type=int, default=1000, help="requests per endpoint")
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS), help=f"subset of {','.join(ENDPOINTS)}")
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-request timeout (s)")
+    parser.add_argument("--out", default="", help="also append result lines to this JSONL file")
+    args = parser.parse_args()
+
+    if not args.base_url:
+        os.environ.setdefault("LOGIN_IP_RATE_PER_MINUTE", "0")  # before .env and the app import
+    load_dotenv()
+    if not args.skip_seed:
+        log_json({"event": "bench_api_seed", **seed_users(args.users, args.seed_workers or None)})
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Microbenchmark: bcrypt login verification throughput vs hashing pool size.
+
+    python -m server.scripts.bench_login --sizes 1,2,4,8 --requests 200
+
+For every pool size it fires `--requests` concurrent verifications through a HashingPool
+(the same path /auth/login uses) and prints one JSON line with throughput and latency.
+`--max-pending` bounds admission like HASH_POOL_MAX_PENDING; rejected calls are counted
+(they are the ones /auth/login answers with 503).
+"""
+from __future__ import annotations
+from pathlib import Path
+import sys
+REPO_ROOT = Path(__file__).resolve().parents[2]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+from datetime import datetime, timezone
+
+from server.crud.hashing import HashingPool, HashingPoolSaturated, hash_password, verify_password
+
+PASSWORD = "Bench123!?"
+
+
+def log_json(metrics: dict) -> None:
+    print(json.dumps(metrics, ensure_ascii=False))
+
+
+async def _one(pool: HashingPool, hashed: str, latencies: list) -> bool:
+    start = time.perf_counter()
+    try:
+        ok = await pool.run(verify_password, PASSWORD, hashed)
+    except HashingPoolSaturated:
+        return False
+    latencies.append(time.perf_counter() - start)
+    return ok
+
+
+async def bench_pool_size(workers: int, requests: int, max_pending: int, hashed: str) -> dict:
+    pool = HashingPool(workers, max_pending)
+    latencies: list = []
+    start = time.perf_counter()
+    await asyncio.gather(*(_one(pool, hashed, latencies) for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+    pool.shutdown()
+
+    latencies.sort()
+    def pct(p: float) -> float:
+        return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000, 3) if latencies else 0.0
+
+    return {
+        "event": "bench_login_verify",
+        "ts": datetime.now(timezone.utc).isoformat(),
+        "pool_workers": workers,
+        "max_pending": pool.max_pending,
+        "requests": requests,
+        "accepted": len(latencies),
+        "rejected": pool.rejected,
+        "duration_seconds": round(elapsed, 6),
+        "verifies_per_second": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms_mean": round(statistics.fmean(latencies) * 1000, 3) if latencies else 0.0,
+        "latency_ms_p50": pct(0.50),
+        "latency_ms_p95": pct(0.95),
+        "latency_ms_p99": pct(0.99),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default=f"1,2,4,{os.cpu_count() or 1}", help="comma-separated pool sizes")
+    parser.add_argument("--requests", type=int, default=200, help="concurrent verifications per pool size")
+    parser.add_argument("--max-pending", type=int, default=0, help="admission bound (0 = unbounded)")
+    args = parser.parse_args()
+
+    hashed = hash_password(PASSWORD)
+    sizes = sorted({int(s) for s in args.sizes.split(",") if s.strip()})
+    for workers in sizes:
+        max_pending = args.max_pending or args.requests
+        log_json(asyncio.run(bench_pool_size(workers, args.requests, max_pending, hashed)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Microbenchmark: roster serialization cost per user, old path vs the orjson fast path.
+
+    python -m server.scripts.bench_serialization --sizes 100,1000,10000,50000
+
+- pydantic: what the route used to do. UserNameStatus per row, then FastAPI validating the
+  result against response_model=UsersNameStatusList and encoding it.
+- orjson:   routers/fast_json.roster_body, straight from the crud rows to bytes.
+
+Prints one JSON line per (size, path) with microseconds per user and body size.
+"""
+from __future__ import annotations
+from pathlib import Path
+import sys
+REPO_ROOT = Path(__file__).resolve().parents[2]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+import argparse
+import json
+import time
+from datetime import datetime, timezone
+from typing import Callable, List
+
+from fastapi.encoders import jsonable_encoder
+
+from server.crud.user_crud import UserWithStatus
+from server.routers.fast_json import roster_body
+from server.routers.user_api import UserNameStatus, UsersNameStatusList
+
+STATUSES = ["working", "working_remotely", "on_vacation", "business_trip", None]
+
+
+def log_json(metrics: dict) -> None:
+    print(json.dumps(metrics, ensure_ascii=False))
+
+
+def make_rows(n: int) -> List[UserWithStatus]:
+    return [UserWithStatus(i, f"First{i:06d}", f"Last{i % 997:03d}", STATUSES[i % len(STATUSES)]) for i in range(1, n + 1)]
+
+
+def pydantic_path(rows: List[UserWithStatus]) -> bytes:
+    items = [UserNameStatus(id=r.id, first_name=r.first_name, last_name=r.last_name, status=r.status) for r in rows]
+    content = {"users": items, "next_cursor": None}
+    # FastAPI: validate against response_model, dump, then jsonable_encoder + json.dumps
+    validated = UsersNameStatusList.model_validate(jsonable_encoder(content))
+    return json.dumps(jsonable_encoder(validated.model_dump()), ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def orjson_path(rows: List[UserWithStatus]) -> bytes:
+    return roster_body(rows)
+
+
+def bench(fn: Callable[[List[UserWithStatus]], bytes], rows: List[UserWithStatus], repeat: int) -> tuple:
+    fn(rows)  # warm-up
+    best = float("inf")
+    body = b""
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = fn(rows)
+        best = min(best, time.perf_counter() - start)
+    return best, len(body)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="100,1000,10000,50000", help="comma-separated roster sizes")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per measurement (best is reported)")
+    args = parser.parse_args()
+
+    for n in sorted({int(s) for s in args.sizes.split(",") if s.strip()}):
+        rows = make_rows(n)
+        for name, fn in (("pydantic", pydantic_path), ("orjson", orjson_path)):
+            seconds, size = bench(fn, rows, args.repeat)
+            log_json({
+                "event": "bench_roster_serialization",
+                "ts": datetime.now(timezone.utc).isoformat(),
+                "path": name,
+                "users": n,
+                "total_ms": round(seconds * 1000, 3),
+                "us_per_user": round(seconds / n * 1e6, 3),
+                "body_bytes": size,
+            })
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""
+Query budgets: how many SQL statements each hot route may run per request.
+
+    python -m server.scripts.check_query_budgets            # DATABASE_URL must name a test database
+    python -m server.scripts.check_query_budgets --max-ms 50 --out budgets.jsonl
+
+The budgets below are enforced by the test suite (server/tests/test_query_budgets.py, against
+TEST_DATABASE_URL); this script replays the same scenarios to report numbers: it runs the app
+in-process (httpx ASGI transport, lifespan included), hooks the engines with
+sql_db/query_counter.py and writes one JSON line per scenario with the statement count, DB time
+and request latency; exits 1 if any scenario is over its budget (the offending statements are
+printed).
+
+It seeds bench users and writes statuses, so it refuses to run unless the database name contains
+"test"; --allow-non-test-db overrides that (e.g. a staging copy).
+
+Optimisations that would hide the DB from the check (roster read model, write-behind, login
+throttling, the scheduler) are switched off for the run.
+"""
+from __future__ import annotations
+from pathlib import Path
+import sys
+REPO_ROOT = Path(__file__).resolve().parents[2]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, List, NamedTuple, Optional
+
+from dotenv import load_dotenv
+import httpx
+from sqlalchemy.engine import make_url
+
+from server.scripts.bench_api import EMAIL_FMT, PASSWORD, git_revision, log_json, seed_users
+
+SEED_USERS = 50
+
+# set before the app is imported: keep every statement on the request path
+BUDGET_ENV = {
+    "ROSTER_READ_MODEL": "false",
+    "STATUS_WRITE_BEHIND": "false",
+    "STATUS_SCHEDULER": "false",
+    "LOGIN_IP_RATE_PER_MINUTE": "0",
+    "LOGIN_EMAIL_RATE_PER_MINUTE": "0",
+    "DATABASE_REPLICA_URLS": "",
+}
+
+
+class Ctx:
+    def __init__(self, http: httpx.AsyncClient, anon: httpx.AsyncClient):
+        self.http = http      # logged in as EMAIL_FMT.format(0)
+        self.anon = anon
+        self.user_id: Optional[int] = None
+        self.etag: Optional[str] = None
+
+
+class Budget(NamedTuple):
+    name: str
+    max_queries: int
+    expected_status: int
+    call: Callable[[Ctx], Awaitable[httpx.Response]]
+    setup: Optional[Callable[[Ctx], Awaitable[None]]] = None  # not counted
+
+
+async def new_ctx(http: httpx.AsyncClient, anon: httpx.AsyncClient) -> Ctx:
+    ctx = Ctx(http, anon)
+    r = await http.post("/auth/login", json={"email": EMAIL_FMT.format(0), "password": PASSWORD})
+    if r.status_code != 200:
+        raise RuntimeError(f"login failed ({r.status_code}); seeded?")
+    ctx.user_id = r.json()["id"]
+    return ctx
+
+
+# <------------------ SCENARIOS -------------------->
+# each setup puts the app in the state its scenario measures, so scenarios run in any order
+def _roster(ctx: Ctx, **params) -> Awaitable[httpx.Response]:
+    return ctx.http.get("/users/list_users_with_statuses", params={"user_id": ctx.user_id, **params})
+
+
+def _set_status(status: str) -> Callable[[Ctx], Awaitable[httpx.Response]]:
+    return lambda c: c.http.put("/user_statuses/update_current_user_status",
+                                params={"user_id": c.user_id, "status": status})
+
+
+async def _cold_principal(_ctx: Ctx) -> None:
+    from server.crud import principal_cache
+    principal_cache.token_cache.clear()
+    principal_cache.user_cache.clear()
+
+
+async def _warm_principal(ctx: Ctx) -> None:
+    await ctx.http.get("/user_statuses/status_counts")
+
+
+async def _cold_roster(_ctx: Ctx) -> None:
+    from server import compression
+    compression.roster_body_cache.clear()
+
+
+async def _warm_roster(ctx: Ctx) -> None:
+    ctx.etag = (await _roster(ctx)).headers.get("etag")
+
+
+def _status_before(status: str) -> Callable[[Ctx], Awaitable[None]]:
+    async def setup(ctx: Ctx) -> None:
+        await _set_status(status)(ctx)
+    return setup
+
+
+BUDGETS: List[Budget] = [
+    Budget("login", 1, 200,
+           lambda c: c.anon.post("/auth/login", json={"email": EMAIL_FMT.format(1), "password": PASSWORD})),
+    Budget("login_wrong_password", 1, 401,
+           lambda c: c.anon.post("/auth/login", json={"email": EMAIL_FMT.format(1), "password": "nope-nope"})),
+    # auth deps: cookie -> principal (1 query when the principal cache is cold, 0 when warm),
+    # on top of status_counts' own query
+    Budget("auth_deps_cold", 2, 200, lambda c: c.http.get("/user_statuses/status_counts"), _cold_principal),
+    Budget("auth_deps_warm", 1, 200, lambda c: c.http.get("/user_statuses/status_counts"), _warm_principal),
+    Budget("status_counts", 1, 200, lambda c: c.http.get("/user_statuses/status_counts")),
+    Budget("roster", 2, 200, lambda c: _roster(c), _cold_roster),
+    Budget("roster_cached_body", 1, 200, lambda c: _roster(c), _warm_roster),
+    Budget("roster_page", 2, 200, lambda c: _roster(c, limit=10), _cold_roster),
+    Budget("roster_304", 1, 304,
+           lambda c: c.http.get("/users/list_users_with_statuses", params={"user_id": c.user_id},
+                                headers={"If-None-Match": c.etag or ""}),
+           _warm_roster),
+    Budget("search_users", 1, 200,
+           lambda c: c.http.get("/users/search_users", params={"user_id": c.user_id, "q": "bench00"})),
+    Budget("get_user_with_status", 1, 200,
+           lambda c: c.http.get("/users/get_user_with_status", params={"user_id": c.user_id, "target_user_id": c.user_id})),
+    Budget("status_update", 1, 200, _set_status("on_vacation"), _status_before("working")),
+    Budget("status_update_unchanged", 1, 200, _set_status("on_vacation"), _status_before("on_vacation")),
+]
+
+
+def is_test_database(url: str) -> bool:
+    """Budgets seed users and write statuses: only databases named like "*test*" are fair game."""
+    return "test" in (make_url(url).database or "").lower()
+
+
+# <------------------ RUN -------------------->
+async def run(args: argparse.Namespace) -> int:
+    from server.main import app
+    from server.sql_db import query_counter
+
+    query_counter.install()
+    failures = 0
+    run_info = {**git_revision(), "db_async": (os.getenv("DB_ASYNC") or "").strip().lower() in {"1", "true", "yes", "on"}}
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://budget.local") as http, \
+                httpx.AsyncClient(transport=transport, base_url="http://budget.local") as anon:
+            try:
+                ctx = await new_ctx(http, anon)
+            except RuntimeError as e:
+                raise SystemExit(str(e))
+
+            for budget in BUDGETS:
+                if budget.setup:
+                    await budget.setup(ctx)
+                with query_counter.count_queries() as q:
+                    start = time.perf_counter()
+                    resp = await budget.call(ctx)
+                    elapsed = time.perf_counter() - start
+
+                over_queries = q.count > budget.max_queries
+                over_time = args.max_ms is not None and elapsed * 1000 > args.max_ms
+                wrong_status = resp.status_code != budget.expected_status
+                ok = not (over_queries or over_time or wrong_status)
+                failures += not ok
+                line = {
+                    "event": "query_budget",
+                    "ts": datetime.now(timezone.utc).isoformat(),
+                    **run_info,
+                    "scenario": budget.name,
+                    "ok": ok,
+                    "status_code": resp.status_code,
+                    "queries": q.count,
+                    "budget": budget.max_queries,
+                    "db_ms": round(q.total_seconds * 1000, 3),
+                    "latency_ms": round(elapsed * 1000, 3),
+                }
+                log_json(line)
+                if args.out:
+                    with open(args.out, "a", encoding="utf-8") as f:
+                        f.write(json.dumps(line, ensure_ascii=False) + "\n")
+                if not ok:
+                    print(f"FAIL {budget.name}: status {resp.status_code} (want {budget.expected_status}), "
+                          f"{q.count} statements (budget {budget.max_queries}), {elapsed * 1000:.1f} ms\n{q.describe()}",
+                          file=sys.stderr)
+    return 1 if failures else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--skip-seed", action="store_true", help="bench users are already there")
+    parser.add_argument("--max-ms", type=float, default=None, help="also fail scenarios slower than this")
+    parser.add_argument("--out", default="", help="also append result lines to this JSONL file")
+    parser.add_argument("--allow-non-test-db", action="store_true",
+                        help="run even though the database name does not contain 'test'")
+    args = parser.parse_args()
+
+    os.environ.update(BUDGET_ENV)  # before .env and the app import
+    load_dotenv()
+    from server.sql_db.db import RAW_URL
+    if not (args.allow_non_test_db or is_test_database(RAW_URL)):
+        raise SystemExit(f"refusing to seed and write to {make_url(RAW_URL).render_as_string(hide_password=True)}: "
+                         "the database name does not contain 'test' (pass --allow-non-test-db to override)")
+    if not args.skip_seed:
+        log_json({"event": "check_query_budgets_seed", **seed_users(SEED_USERS, None)})
+    raise SystemExit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
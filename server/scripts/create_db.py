@@ -7,7 +7,7 @@ if str(REPO_ROOT) not in sys.path:
 
 from datetime import datetime, timezone
 from dotenv import load_dotenv
-import json, time
+import argparse, json, time
 
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
@@ -103,18 +103,30 @@ def seed_users_and_statuses(db: Session) -> None:
         })
 
 def main() -> None:
+    parser = argparse.ArgumentParser(description="Apply schema.sql, then seed the demo users or import a file.")
+    parser.add_argument("--import", dest="import_path", type=Path, default=None,
+                        help="CSV/JSONL of users to bulk-load instead of the demo seed (see import_users.py)")
+    parser.add_argument("--batch-size", type=int, default=5000, help="rows per COPY batch (with --import)")
+    parser.add_argument("--workers", type=int, default=0, help="hashing processes, 0 = CPU count (with --import)")
+    args = parser.parse_args()
+
     load_dotenv()
     start = time.monotonic()
     ts = datetime.now(timezone.utc)
     success = 0
     error_type = ""
     stmt_count = 0
+    import_metrics: dict = {}
     try:
         sql_text = read_sql(DEFAULT_SCHEMA_PATH)
         stmt_count = naive_statement_count(sql_text)
         apply_schema(sql_text)
-        with SessionLocal() as db:
-            seed_users_and_statuses(db)
+        if args.import_path:
+            from server.scripts.import_users import import_users
+            import_metrics = import_users(args.import_path, args.batch_size, args.workers or None)
+        else:
+            with SessionLocal() as db:
+                seed_users_and_statuses(db)
         success = 1
     except Exception as e:
         error_type = e.__class__.__name__
@@ -122,7 +134,7 @@ def main() -> None:
     finally:
         duration = time.monotonic() - start
         log_json({
-            "event": "apply_schema_and_seed_users",
+            "event": "apply_schema_and_import_users" if args.import_path else "apply_schema_and_seed_users",
             "schema_path": str(DEFAULT_SCHEMA_PATH),
             "duration_seconds": round(duration, 6),
             "success": success,
@@ -130,6 +142,7 @@ def main() -> None:
             "error_type": error_type,
             "ts": ts.isoformat(),
             "ts_unix": int(ts.timestamp()),
+            **({"import": import_metrics} if args.import_path else {}),
         })
         if success:
             print(f"Schema applied + users & statuses seeded via CRUD. Source: {DEFAULT_SCHEMA_PATH}")
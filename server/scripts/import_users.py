@@ -0,0 +1,225 @@
+"""
+Bulk import of users + statuses (staging loads, e.g. a 50k-employee org).
+
+    python -m server.scripts.import_users people.csv --batch-size 5000 --workers 8
+    python -m server.scripts.create_db --import people.jsonl
+
+Input: CSV with a header row, or JSONL (one object per line), with fields
+email, first_name, last_name, status and optionally password (plain text; default is the
+seed convention FirstName123!?).
+
+Per batch:
+1. emails that already exist are looked up first and never re-hashed;
+2. new passwords are bcrypt-hashed across a process pool;
+3. the batch is COPYed into a temp staging table and merged with
+   INSERT ... ON CONFLICT into users and user_statuses in one transaction.
+
+Re-running the same file is a no-op: existing users are kept, statuses only change when
+they differ. Metrics go out as log_json lines (one per batch plus a summary).
+"""
+from __future__ import annotations
+from pathlib import Path
+import sys
+REPO_ROOT = Path(__file__).resolve().parents[2]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+import argparse
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional
+
+from dotenv import load_dotenv
+
+from server.crud.hashing import hash_password
+from server.schemas.user_statuses_schema import Status
+from server.scripts.create_db import _make_initial_password, _now_iso, log_json
+
+DEFAULT_BATCH_SIZE = 5000
+_STATUSES = {s.value for s in Status}
+
+_STAGING_DDL = """
+CREATE TEMP TABLE import_users_staging (
+  email      TEXT NOT NULL,
+  password   TEXT,            -- NULL = user already exists, not re-hashed
+  first_name TEXT NOT NULL,
+  last_name  TEXT NOT NULL,
+  status     TEXT NOT NULL
+) ON COMMIT DROP
+"""
+
+_MERGE_USERS = """
+INSERT INTO users (email, password, first_name, last_name)
+SELECT email, password, first_name, last_name
+FROM import_users_staging
+WHERE password IS NOT NULL
+ON CONFLICT (email) DO NOTHING
+"""
+
+_MERGE_STATUSES = """
+INSERT INTO user_statuses (user_id, status, updated_at)
+SELECT u.id, s.status, now()
+FROM import_users_staging s
+JOIN users u ON u.email = s.email
+ON CONFLICT (user_id) DO UPDATE
+  SET status = EXCLUDED.status, updated_at = EXCLUDED.updated_at
+  WHERE user_statuses.status IS DISTINCT FROM EXCLUDED.status
+"""
+
+
+# <------------------ INPUT -------------------->
+def read_records(path: Path) -> Iterator[Dict[str, str]]:
+    with path.open(encoding="utf-8-sig", newline="") as f:
+        if path.suffix.lower() == ".csv":
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def _normalize(rec: Dict[str, str]) -> Optional[Dict[str, str]]:
+    email = (rec.get("email") or "").strip()
+    first_name = (rec.get("first_name") or "").strip()
+    last_name = (rec.get("last_name") or "").strip()
+    status = (rec.get("status") or "working").strip().lower()
+    if not email or not first_name or not last_name or status not in _STATUSES:
+        return None
+    password = rec.get("password") or _make_initial_password(first_name)
+    return {"email": email, "first_name": first_name, "last_name": last_name,
+            "status": status, "password": password}
+
+
+def _batches(records: Iterator[Dict[str, str]], size: int) -> Iterator[List[Dict[str, str]]]:
+    batch: List[Dict[str, str]] = []
+    for rec in records:
+        batch.append(rec)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# <------------------ LOAD -------------------->
+def _load_batch(conn, rows: List[Dict[str, str]]) -> Dict[str, int]:
+    """One transaction: staging COPY + two merges. `password` is already a hash (or None)."""
+    try:
+        with conn.cursor() as cur:
+            cur.execute(_STAGING_DDL)
+            with cur.copy(
+                "COPY import_users_staging (email, password, first_name, last_name, status) FROM STDIN"
+            ) as copy:
+                for r in rows:
+                    copy.write_row((r["email"], r["password"], r["first_name"], r["last_name"], r["status"]))
+            cur.execute(_MERGE_USERS)
+            users_inserted = cur.rowcount
+            cur.execute(_MERGE_STATUSES)
+            statuses_written = cur.rowcount
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return {"users_inserted": users_inserted, "statuses_written": statuses_written}
+
+
+def _existing_emails(conn, emails: List[str]) -> set:
+    with conn.cursor() as cur:
+        cur.execute("SELECT email FROM users WHERE email = ANY(%s)", (emails,))
+        found = {row[0] for row in cur.fetchall()}
+    conn.commit()
+    return found
+
+
+def import_users(path: Path, batch_size: int = DEFAULT_BATCH_SIZE, workers: Optional[int] = None) -> dict:
+    from server.sql_db.db import engine
+
+    workers = workers or os.cpu_count() or 1
+    totals = {"rows_read": 0, "rows_invalid": 0, "users_inserted": 0, "users_existing": 0,
+              "statuses_written": 0, "hash_seconds": 0.0, "load_seconds": 0.0}
+    start = time.monotonic()
+
+    raw = engine.raw_connection()
+    try:
+        conn = raw.driver_connection  # psycopg.Connection: COPY needs the driver API
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for batch_no, batch in enumerate(_batches(read_records(path), batch_size), start=1):
+                t0 = time.monotonic()
+                by_email: Dict[str, Dict[str, str]] = {}
+                for rec in batch:
+                    row = _normalize(rec)
+                    if row is None:
+                        totals["rows_invalid"] += 1
+                    else:
+                        by_email[row["email"]] = row  # duplicate email in a batch: last one wins
+                totals["rows_read"] += len(batch)
+                if not by_email:
+                    continue
+
+                existing = _existing_emails(conn, list(by_email))
+                new_rows = [r for e, r in by_email.items() if e not in existing]
+                t_hash = time.monotonic()
+                chunk = max(1, len(new_rows) // (workers * 4))
+                hashes = list(pool.map(hash_password, [r["password"] for r in new_rows], chunksize=chunk))
+                hash_seconds = time.monotonic() - t_hash
+                for r, h in zip(new_rows, hashes):
+                    r["password"] = h
+                for e in existing:
+                    by_email[e]["password"] = None
+
+                t_load = time.monotonic()
+                counts = _load_batch(conn, list(by_email.values()))
+                load_seconds = time.monotonic() - t_load
+
+                totals["users_existing"] += len(existing)
+                totals["users_inserted"] += counts["users_inserted"]
+                totals["statuses_written"] += counts["statuses_written"]
+                totals["hash_seconds"] += hash_seconds
+                totals["load_seconds"] += load_seconds
+                elapsed = time.monotonic() - t0
+                log_json({
+                    "event": "import_users_batch",
+                    "ts": _now_iso(),
+                    "batch": batch_no,
+                    "rows": len(batch),
+                    "hashed": len(new_rows),
+                    **counts,
+                    "hash_seconds": round(hash_seconds, 6),
+                    "load_seconds": round(load_seconds, 6),
+                    "rows_per_second": round(len(batch) / elapsed, 2) if elapsed else 0.0,
+                })
+    finally:
+        raw.close()
+
+    duration = time.monotonic() - start
+    totals["hash_seconds"] = round(totals["hash_seconds"], 6)
+    totals["load_seconds"] = round(totals["load_seconds"], 6)
+    return {
+        **totals,
+        "source": str(path),
+        "batch_size": batch_size,
+        "hash_workers": workers,
+        "duration_seconds": round(duration, 6),
+        "rows_per_second": round(totals["rows_read"] / duration, 2) if duration else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", type=Path, help="CSV (with header) or JSONL file")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--workers", type=int, default=0, help="hashing processes (0 = CPU count)")
+    args = parser.parse_args()
+
+    load_dotenv()
+    ts = datetime.now(timezone.utc)
+    metrics = import_users(args.path, args.batch_size, args.workers or None)
+    log_json({"event": "import_users", **metrics, "ts": ts.isoformat(), "ts_unix": int(ts.timestamp())})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Per-request statement counting for query budgets (see scripts/check_query_budgets.py).
+
+    install()                       # once: hooks the app's engines (sync, async, replicas)
+    with count_queries() as q:      # everything executed in this context is recorded
+        await client.get(...)
+    q.count, q.total_seconds, q.statements
+
+    with assert_max_queries(2):     # raises QueryBudgetExceeded listing the statements
+        ...
+
+Recording follows the contextvars context: the request's own statements are counted (the thread
+pool in sync mode and run_sync in async mode both inherit it), while background tasks started
+at app startup (listener, scheduler, read model sweep) are not.
+"""
+from __future__ import annotations
+import contextlib
+import contextvars
+import time
+from typing import Iterator, List, NamedTuple, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class Statement(NamedTuple):
+    verb: str
+    sql: str
+    seconds: float
+
+
+class QueryLog:
+    def __init__(self) -> None:
+        self.statements: List[Statement] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(s.seconds for s in self.statements)
+
+    def describe(self) -> str:
+        return "\n".join(f"  {i}. [{s.seconds * 1000:.2f} ms] {' '.join(s.sql.split())[:300]}"
+                         for i, s in enumerate(self.statements, start=1))
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+_current: contextvars.ContextVar[Optional[QueryLog]] = contextvars.ContextVar("query_log", default=None)
+_installed: set = set()
+
+
+def _before(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None and context is not None:
+        context._query_counter_start = time.perf_counter()
+
+
+def _after(conn, cursor, statement, parameters, context, executemany):
+    log = _current.get()
+    start = getattr(context, "_query_counter_start", None)
+    if log is not None and start is not None:
+        head = statement[:16].lstrip().split(None, 1)
+        log.statements.append(Statement(head[0].upper() if head else "OTHER", statement, time.perf_counter() - start))
+
+
+def install_engine(engine: Engine) -> None:
+    if id(engine) in _installed:
+        return
+    event.listen(engine, "before_cursor_execute", _before)
+    event.listen(engine, "after_cursor_execute", _after)
+    _installed.add(id(engine))
+
+
+def install() -> None:
+    """Hook every engine the app uses."""
+    from server.sql_db.db import async_engine, engine
+    from server.sql_db.replicas import replicas
+
+    install_engine(engine)
+    install_engine(async_engine.sync_engine)
+    for r in replicas:
+        install_engine(r.engine)
+        install_engine(r.async_engine.sync_engine)
+
+
+@contextlib.contextmanager
+def count_queries() -> Iterator[QueryLog]:
+    log = QueryLog()
+    token = _current.set(log)
+    try:
+        yield log
+    finally:
+        _current.reset(token)
+
+
+@contextlib.contextmanager
+def assert_max_queries(limit: int, label: str = "block") -> Iterator[QueryLog]:
+    with count_queries() as log:
+        yield log
+    if log.count > limit:
+        raise QueryBudgetExceeded(f"{label}: {log.count} statements, budget {limit}\n{log.describe()}")
@@ -0,0 +1,194 @@
+"""
+Optional read replicas (DATABASE_REPLICA_URLS=postgresql://...,postgresql://...).
+
+- Read-only routes depend on `get_read_db`: round-robin over replicas whose measured lag is
+  within REPLICA_MAX_LAG_SECONDS, primary when none qualifies.
+- Write routes add `Depends(pin_reads_to_primary)`: it sets a short-lived cookie that sends
+  that browser's reads to the primary for REPLICA_STICKY_SECONDS (read-your-own-writes).
+- Lag is measured by a background task (lifespan), never on the request path.
+
+With no replicas configured `get_read_db` IS `get_db`, so a request keeps sharing one session.
+Local check with two Postgres instances: point DATABASE_REPLICA_URLS at the standby and watch
+db_read_route_total{target=...} on /metrics.
+"""
+from __future__ import annotations
+import asyncio
+import itertools
+import logging
+import os
+import threading
+import time
+from typing import List, Optional
+
+from fastapi import Request, Response
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from starlette.concurrency import run_in_threadpool
+
+from server import metrics
+from server.metrics import TimedAsyncQueuePool, TimedQueuePool, instrument_engine
+from server.sql_db.db import AsyncSessionLocal, DB_ASYNC, SessionLocal, _as_sqlalchemy_url, get_db
+
+log = logging.getLogger(__name__)
+
+REPLICA_URLS = [u.strip() for u in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if u.strip()]
+MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))
+CHECK_SECONDS = float(os.getenv("REPLICA_CHECK_SECONDS", "2"))
+STICKY_SECONDS = int(os.getenv("REPLICA_STICKY_SECONDS", "10"))
+RYW_COOKIE = "db_primary_until"
+
+# 0 when the standby has replayed everything it received (an idle primary is not "lag"),
+# otherwise the age of the last replayed transaction; 0 if the URL points at a primary.
+# NULL (unusable) when no WAL receiver is streaming: a disconnected standby has replayed all
+# it received too, it just receives nothing. Reading pg_stat_wal_receiver.status needs the
+# pg_read_all_stats (or pg_monitor) role; without it the replica is never used.
+_LAG_SQL = text("""
+SELECT CASE
+  WHEN NOT pg_is_in_recovery() THEN 0
+  WHEN NOT EXISTS (SELECT 1 FROM pg_stat_wal_receiver WHERE status = 'streaming') THEN NULL
+  WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+  ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+""")
+
+
+class Replica:
+    def __init__(self, index: int, raw_url: str):
+        url = _as_sqlalchemy_url(raw_url)
+        self.name = f"replica{index}"
+        self.engine = create_engine(url, pool_pre_ping=True, future=True, poolclass=TimedQueuePool)
+        self.async_engine = create_async_engine(url, pool_pre_ping=True, poolclass=TimedAsyncQueuePool)
+        instrument_engine(self.engine)
+        instrument_engine(self.async_engine.sync_engine)
+        self.SessionLocal = sessionmaker(bind=self.engine, autoflush=False, expire_on_commit=False, future=True)
+        self.AsyncSessionLocal = async_sessionmaker(bind=self.async_engine, autoflush=False, expire_on_commit=False)
+        self.lag_seconds: Optional[float] = None  # None = unknown / unreachable
+        self.checked_at: Optional[float] = None
+
+    @property
+    def usable(self) -> bool:
+        return self.lag_seconds is not None and self.lag_seconds <= MAX_LAG_SECONDS
+
+    def check(self) -> None:
+        try:
+            with self.engine.connect() as conn:
+                lag = conn.execute(_LAG_SQL).scalar()
+            if lag is None and self.lag_seconds is not None:
+                log.warning("%s is not streaming from its primary; reads fall back to the primary", self.name)
+            self.lag_seconds = None if lag is None else float(lag)
+        except Exception:
+            if self.lag_seconds is not None:
+                log.warning("%s unreachable; reads fall back to the primary", self.name, exc_info=True)
+            self.lag_seconds = None
+        self.checked_at = time.monotonic()
+
+
+replicas: List[Replica] = [Replica(i, u) for i, u in enumerate(REPLICA_URLS)]
+_rr = itertools.count()
+_rr_lock = threading.Lock()
+
+
+def pick_replica() -> Optional[Replica]:
+    usable = [r for r in replicas if r.usable]
+    if not usable:
+        return None
+    with _rr_lock:
+        i = next(_rr)
+    return usable[i % len(usable)]
+
+
+def _pinned_to_primary(request: Request) -> bool:
+    raw = request.cookies.get(RYW_COOKIE)
+    try:
+        return raw is not None and float(raw) > time.time()
+    except ValueError:
+        return False
+
+
+def _route(request: Request) -> Optional[Replica]:
+    replica = None if _pinned_to_primary(request) else pick_replica()
+    request.state.db_read_target = replica.name if replica else "primary"
+    metrics.DB_READ_ROUTE.labels(request.state.db_read_target).inc()
+    return replica
+
+
+def read_target(request: Request) -> str:
+    """Where this request's get_read_db session reads from: "primary" or a replica name."""
+    return getattr(request.state, "db_read_target", "primary")
+
+
+# <------------------ DEPENDENCIES -------------------->
+def get_sync_read_db(request: Request):
+    replica = _route(request)
+    db = (replica.SessionLocal if replica else SessionLocal)()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db(request: Request):
+    replica = _route(request)
+    async with (replica.AsyncSessionLocal if replica else AsyncSessionLocal)() as db:
+        yield db
+
+
+if not replicas:
+    get_read_db = get_db
+elif DB_ASYNC:
+    get_read_db = get_async_read_db
+else:
+    get_read_db = get_sync_read_db
+
+
+def pin_reads_to_primary(response: Response) -> None:
+    """Dependency for write routes: this client's next reads see its own write."""
+    if replicas:
+        from server.routers.auth import _cookie_settings  # same secure/samesite/domain as the auth cookie
+
+        cfg = _cookie_settings()
+        response.set_cookie(
+            RYW_COOKIE,
+            str(int(time.time()) + STICKY_SECONDS),
+            max_age=STICKY_SECONDS,
+            httponly=True,
+            secure=cfg["secure"],
+            samesite=cfg["samesite"],
+            path=cfg["path"],
+            domain=cfg["domain"],
+        )
+
+
+# <------------------ LAG MONITOR -------------------->
+def check_all() -> None:
+    for r in replicas:
+        r.check()
+
+
+async def _monitor_forever() -> None:
+    while True:
+        await asyncio.sleep(CHECK_SECONDS)
+        await run_in_threadpool(check_all)
+
+
+_task: Optional[asyncio.Task] = None
+
+
+async def start() -> None:
+    global _task
+    if not replicas:
+        return
+    await run_in_threadpool(check_all)  # replicas are unused until their first lag reading
+    _task = asyncio.create_task(_monitor_forever(), name="replica-lag-monitor")
+
+
+async def stop() -> None:
+    global _task
+    if _task:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
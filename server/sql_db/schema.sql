@@ -15,5 +15,367 @@ CREATE TABLE IF NOT EXISTS user_statuses (
   updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
 );
 
--- Optional helper index if you often filter by status
-CREATE INDEX IF NOT EXISTS idx_user_statuses_status ON user_statuses(status);
+-- Teams (departments) and membership; a user may belong to several teams
+CREATE TABLE IF NOT EXISTS teams (
+  id   BIGSERIAL PRIMARY KEY,
+  name TEXT      NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS team_members (
+  team_id BIGINT NOT NULL REFERENCES teams(id) ON DELETE CASCADE,
+  user_id BIGINT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+  PRIMARY KEY (team_id, user_id)       -- team roster: range scan over one team's members
+);
+
+-- user -> teams (version bumps, push filtering, cascades from users)
+CREATE INDEX IF NOT EXISTS idx_team_members_user ON team_members(user_id, team_id);
+
+-- Roster order (first_name, last_name, id), bytewise like user_crud.ROSTER_ORDER: keyset pages
+-- become index range scans, not a full sort. Replaces the locale-ordered idx_users_name_order.
+CREATE INDEX IF NOT EXISTS idx_users_roster_order ON users(first_name COLLATE "C", last_name COLLATE "C", id);
+DROP INDEX IF EXISTS idx_users_name_order;
+
+-- Roster filtered by status: status -> user_id straight from the index. Its leading column
+-- serves plain status filters too, so the former status-only index is dropped.
+CREATE INDEX IF NOT EXISTS idx_user_statuses_status_user ON user_statuses(status, user_id);
+DROP INDEX IF EXISTS idx_user_statuses_status;
+
+-- Typeahead search (crud.user_crud.search_users). Needs pg_trgm (contrib; CREATE privilege on the DB).
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Substring + fuzzy match on one lowercased document per user; the expression must stay
+-- identical to user_crud._search_doc() or the planner will not use the index.
+CREATE INDEX IF NOT EXISTS idx_users_search_trgm
+  ON users USING GIN ((lower(first_name || ' ' || last_name || ' ' || email)) gin_trgm_ops);
+
+-- 1-2 character queries (no trigrams yet): prefix range scans on each field
+CREATE INDEX IF NOT EXISTS idx_users_first_name_prefix ON users (lower(first_name) text_pattern_ops);
+CREATE INDEX IF NOT EXISTS idx_users_last_name_prefix  ON users (lower(last_name) text_pattern_ops);
+CREATE INDEX IF NOT EXISTS idx_users_email_prefix      ON users (lower(email) text_pattern_ops);
+
+-- Roster version (ETag source): bumped by triggers whenever a roster-visible row changes,
+-- so "has anything changed?" is a primary-key lookup instead of the full users/status join.
+CREATE TABLE IF NOT EXISTS roster_versions (
+  scope   TEXT   PRIMARY KEY,            -- 'all' = company-wide roster
+  version BIGINT NOT NULL DEFAULT 0
+);
+INSERT INTO roster_versions (scope) VALUES ('all') ON CONFLICT (scope) DO NOTHING;
+
+-- Team rosters have their own scope ('team:<id>'), so a change only invalidates the teams
+-- the users belong to. Rows are upserted in team_id order (no deadlocks between writers).
+DROP FUNCTION IF EXISTS bump_team_roster_versions(BIGINT);
+CREATE OR REPLACE FUNCTION bump_team_roster_versions(uids BIGINT[]) RETURNS void AS $$
+BEGIN
+  INSERT INTO roster_versions (scope, version)
+  SELECT 'team:' || t.team_id, 1
+  FROM (SELECT DISTINCT tm.team_id FROM team_members tm WHERE tm.user_id = ANY (uids)) t
+  ORDER BY t.team_id
+  ON CONFLICT (scope) DO UPDATE SET version = roster_versions.version + 1;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Statement-level: a statement writing N roster rows bumps each version row once, instead of
+-- N times in a row on the hot 'all' row. Statements that change nothing roster-visible (no
+-- rows, or UPDATEs keeping the same names/status) don't bump at all.
+CREATE OR REPLACE FUNCTION bump_roster_version() RETURNS trigger AS $$
+DECLARE
+  uids BIGINT[];
+BEGIN
+  IF TG_TABLE_NAME = 'users' THEN
+    IF TG_OP = 'INSERT' THEN
+      SELECT array_agg(id) INTO uids FROM new_rows;
+    ELSIF TG_OP = 'DELETE' THEN
+      SELECT array_agg(id) INTO uids FROM old_rows;
+    ELSE
+      SELECT array_agg(n.id) INTO uids
+      FROM new_rows n JOIN old_rows o ON o.id = n.id
+      WHERE o.first_name IS DISTINCT FROM n.first_name OR o.last_name IS DISTINCT FROM n.last_name;
+    END IF;
+  ELSIF TG_OP = 'INSERT' THEN
+    SELECT array_agg(user_id) INTO uids FROM new_rows;
+  ELSIF TG_OP = 'DELETE' THEN
+    SELECT array_agg(user_id) INTO uids FROM old_rows;
+  ELSE
+    SELECT array_agg(n.user_id) INTO uids
+    FROM new_rows n JOIN old_rows o ON o.user_id = n.user_id
+    WHERE o.status IS DISTINCT FROM n.status;
+  END IF;
+  IF uids IS NULL THEN
+    RETURN NULL;
+  END IF;
+
+  UPDATE roster_versions SET version = version + 1 WHERE scope = 'all';
+  -- a new user has no teams yet; a deleted one is covered by the team_members cascade
+  IF TG_TABLE_NAME <> 'users' OR TG_OP = 'UPDATE' THEN
+    PERFORM bump_team_roster_versions(uids);
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION bump_team_membership_version() RETURNS trigger AS $$
+DECLARE
+  tid BIGINT := CASE WHEN TG_OP = 'DELETE' THEN OLD.team_id ELSE NEW.team_id END;
+  uid BIGINT := CASE WHEN TG_OP = 'DELETE' THEN OLD.user_id ELSE NEW.user_id END;
+BEGIN
+  INSERT INTO roster_versions (scope, version) VALUES ('team:' || tid, 1)
+  ON CONFLICT (scope) DO UPDATE SET version = roster_versions.version + 1;
+  -- team-filtered streams reload that team's roster
+  PERFORM pg_notify('user_status_changed',
+    json_build_object('user_id', uid, 'status', NULL, 'updated_at', NULL,
+                      'team_ids', json_build_array(tid), 'membership', true)::text);
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Transition tables allow one event per trigger (and no column list), hence three per table
+-- (replacing the former row-level triggers; the _upd names are reused)
+DROP TRIGGER IF EXISTS trg_users_roster_version ON users;
+DROP TRIGGER IF EXISTS trg_users_roster_version_upd ON users;
+DROP TRIGGER IF EXISTS trg_user_statuses_roster_version ON user_statuses;
+DROP TRIGGER IF EXISTS trg_user_statuses_roster_version_upd ON user_statuses;
+
+CREATE OR REPLACE TRIGGER trg_users_roster_version_ins
+  AFTER INSERT ON users
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION bump_roster_version();
+
+CREATE OR REPLACE TRIGGER trg_users_roster_version_upd
+  AFTER UPDATE ON users
+  REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION bump_roster_version();
+
+CREATE OR REPLACE TRIGGER trg_users_roster_version_del
+  AFTER DELETE ON users
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION bump_roster_version();
+
+CREATE OR REPLACE TRIGGER trg_user_statuses_roster_version_ins
+  AFTER INSERT ON user_statuses
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION bump_roster_version();
+
+CREATE OR REPLACE TRIGGER trg_user_statuses_roster_version_upd
+  AFTER UPDATE ON user_statuses
+  REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION bump_roster_version();
+
+CREATE OR REPLACE TRIGGER trg_user_statuses_roster_version_del
+  AFTER DELETE ON user_statuses
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION bump_roster_version();
+
+CREATE OR REPLACE TRIGGER trg_team_members_roster_version
+  AFTER INSERT OR DELETE ON team_members
+  FOR EACH ROW EXECUTE FUNCTION bump_team_membership_version();
+
+-- Live status push: every real status change is NOTIFYed at COMMIT (see crud/status_events.py).
+-- Channel name must match status_events.CHANNEL.
+CREATE OR REPLACE FUNCTION notify_user_status_changed() RETURNS trigger AS $$
+BEGIN
+  -- team_ids lets team-filtered streams skip other teams' changes
+  IF TG_OP = 'DELETE' THEN
+    PERFORM pg_notify('user_status_changed',
+      json_build_object('user_id', OLD.user_id, 'status', NULL, 'updated_at', NULL,
+        'team_ids', (SELECT coalesce(json_agg(team_id), '[]'::json) FROM team_members WHERE user_id = OLD.user_id))::text);
+  ELSE
+    PERFORM pg_notify('user_status_changed',
+      json_build_object('user_id', NEW.user_id, 'status', NEW.status, 'updated_at', NEW.updated_at,
+        'team_ids', (SELECT coalesce(json_agg(team_id), '[]'::json) FROM team_members WHERE user_id = NEW.user_id))::text);
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE TRIGGER trg_user_statuses_notify
+  AFTER INSERT OR DELETE ON user_statuses
+  FOR EACH ROW EXECUTE FUNCTION notify_user_status_changed();
+
+CREATE OR REPLACE TRIGGER trg_user_statuses_notify_upd
+  AFTER UPDATE OF status ON user_statuses
+  FOR EACH ROW
+  WHEN (OLD.status IS DISTINCT FROM NEW.status)
+  EXECUTE FUNCTION notify_user_status_changed();
+
+-- Status history: append-only, one row per real status change (written by trigger below).
+-- Range-partitioned by month on changed_at; BRIN keeps time-range scans cheap across years.
+CREATE TABLE IF NOT EXISTS user_status_history (
+  id              BIGINT      GENERATED ALWAYS AS IDENTITY,
+  user_id         BIGINT      NOT NULL,      -- no FK: history outlives deleted users
+  status          TEXT,                      -- NULL = status row deleted
+  previous_status TEXT,                      -- NULL = no status before this change
+  changed_at      TIMESTAMPTZ NOT NULL,
+  PRIMARY KEY (id, changed_at)
+) PARTITION BY RANGE (changed_at);
+
+-- Safety net for rows outside the pre-created months
+CREATE TABLE IF NOT EXISTS user_status_history_default PARTITION OF user_status_history DEFAULT;
+
+CREATE INDEX IF NOT EXISTS idx_user_status_history_changed_brin ON user_status_history USING BRIN (changed_at);
+CREATE INDEX IF NOT EXISTS idx_user_status_history_user_time ON user_status_history (user_id, changed_at);
+
+-- Creates monthly partitions from this month up to months_ahead (idempotent). Run on every
+-- schema apply and periodically by the app (crud/status_scheduler.py), so months keep coming.
+-- Rows of a month that already sit in the default partition (written before the month had its
+-- own) would make CREATE ... PARTITION OF fail: the partition is built as a plain table, those
+-- rows are moved into it, then it is attached. The default partition stays locked meanwhile,
+-- so no row of that month can slip in and concurrent callers create each month once.
+CREATE OR REPLACE FUNCTION ensure_user_status_history_partitions(months_ahead INT DEFAULT 12) RETURNS void AS $$
+DECLARE
+  month_start DATE;
+  month_end   DATE;
+  part_name   TEXT;
+BEGIN
+  FOR i IN 0..months_ahead LOOP
+    month_start := (date_trunc('month', now()) + make_interval(months => i))::date;
+    month_end := (month_start + INTERVAL '1 month')::date;
+    part_name := 'user_status_history_' || to_char(month_start, 'YYYYMM');
+    CONTINUE WHEN to_regclass(quote_ident(part_name)) IS NOT NULL;
+
+    LOCK TABLE user_status_history_default IN ACCESS EXCLUSIVE MODE;
+    CONTINUE WHEN to_regclass(quote_ident(part_name)) IS NOT NULL;  -- created while we waited
+
+    EXECUTE 'CREATE TABLE ' || quote_ident(part_name) || ' (LIKE user_status_history)';
+    EXECUTE 'WITH moved AS (DELETE FROM user_status_history_default'
+      || ' WHERE changed_at >= $1 AND changed_at < $2'
+      || ' RETURNING id, user_id, status, previous_status, changed_at)'
+      || ' INSERT INTO ' || quote_ident(part_name) || ' SELECT * FROM moved'
+      USING month_start, month_end;
+    EXECUTE 'ALTER TABLE user_status_history ATTACH PARTITION ' || quote_ident(part_name)
+      || ' FOR VALUES FROM (' || quote_literal(month_start) || ') TO (' || quote_literal(month_end) || ')';
+  END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT ensure_user_status_history_partitions(12);
+
+CREATE OR REPLACE FUNCTION record_user_status_history() RETURNS trigger AS $$
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    INSERT INTO user_status_history (user_id, status, previous_status, changed_at)
+    VALUES (NEW.user_id, NEW.status, NULL, NEW.updated_at);
+  ELSIF TG_OP = 'UPDATE' THEN
+    INSERT INTO user_status_history (user_id, status, previous_status, changed_at)
+    VALUES (NEW.user_id, NEW.status, OLD.status, NEW.updated_at);
+  ELSE
+    INSERT INTO user_status_history (user_id, status, previous_status, changed_at)
+    VALUES (OLD.user_id, NULL, OLD.status, now());
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE TRIGGER trg_user_statuses_history
+  AFTER INSERT OR DELETE ON user_statuses
+  FOR EACH ROW EXECUTE FUNCTION record_user_status_history();
+
+CREATE OR REPLACE TRIGGER trg_user_statuses_history_upd
+  AFTER UPDATE OF status ON user_statuses
+  FOR EACH ROW
+  WHEN (OLD.status IS DISTINCT FROM NEW.status)
+  EXECUTE FUNCTION record_user_status_history();
+
+-- First install on an existing DB: start history from the current statuses
+INSERT INTO user_status_history (user_id, status, previous_status, changed_at)
+SELECT s.user_id, s.status, NULL, s.updated_at
+FROM user_statuses s
+WHERE NOT EXISTS (SELECT 1 FROM user_status_history);
+
+-- Status counts for dashboards: one row per status, kept exact by statement-level triggers that
+-- apply each statement's net delta (a 1000-row bulk write = one counter UPSERT, not 1000).
+-- Reading the summary is O(number of statuses) instead of a scan of user_statuses.
+CREATE TABLE IF NOT EXISTS user_status_counts (
+  status TEXT   PRIMARY KEY,
+  n      BIGINT NOT NULL DEFAULT 0
+);
+
+CREATE OR REPLACE FUNCTION apply_user_status_counts() RETURNS trigger AS $$
+BEGIN
+  -- ORDER BY status: concurrent writers lock counter rows in the same order (no deadlocks)
+  IF TG_OP = 'INSERT' THEN
+    INSERT INTO user_status_counts AS c (status, n)
+    SELECT status, count(*) FROM new_rows GROUP BY status ORDER BY status
+    ON CONFLICT (status) DO UPDATE SET n = c.n + EXCLUDED.n;
+  ELSIF TG_OP = 'UPDATE' THEN
+    INSERT INTO user_status_counts AS c (status, n)
+    SELECT status, sum(d) FROM (
+      SELECT status, 1 AS d FROM new_rows
+      UNION ALL
+      SELECT status, -1 AS d FROM old_rows
+    ) delta
+    GROUP BY status HAVING sum(d) <> 0 ORDER BY status
+    ON CONFLICT (status) DO UPDATE SET n = c.n + EXCLUDED.n;
+  ELSE
+    INSERT INTO user_status_counts AS c (status, n)
+    SELECT status, -count(*) FROM old_rows GROUP BY status ORDER BY status
+    ON CONFLICT (status) DO UPDATE SET n = c.n + EXCLUDED.n;
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Transition tables allow one event per trigger, hence three triggers
+CREATE OR REPLACE TRIGGER trg_user_statuses_counts_ins
+  AFTER INSERT ON user_statuses
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION apply_user_status_counts();
+
+CREATE OR REPLACE TRIGGER trg_user_statuses_counts_upd
+  AFTER UPDATE ON user_statuses
+  REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION apply_user_status_counts();
+
+CREATE OR REPLACE TRIGGER trg_user_statuses_counts_del
+  AFTER DELETE ON user_statuses
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION apply_user_status_counts();
+
+-- (Re)build from the source of truth on every schema apply; zero rows for unused statuses
+INSERT INTO user_status_counts (status, n)
+SELECT v.status, count(s.user_id)
+FROM (VALUES ('working'), ('working_remotely'), ('on_vacation'), ('business_trip')) AS v(status)
+LEFT JOIN user_statuses s ON s.status = v.status
+GROUP BY v.status
+ON CONFLICT (status) DO UPDATE SET n = EXCLUDED.n;
+
+-- Scheduled statuses (vacations, business trips known in advance). Applied by the in-app
+-- scheduler (crud/status_scheduler.py) in batches claimed with FOR UPDATE SKIP LOCKED, so any
+-- number of app processes can run it. state: pending -> active -> done, or cancelled.
+CREATE TABLE IF NOT EXISTS scheduled_statuses (
+  id              BIGINT      GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+  user_id         BIGINT      NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+  status          TEXT        NOT NULL,
+  starts_at       TIMESTAMPTZ NOT NULL,
+  ends_at         TIMESTAMPTZ,               -- NULL = the status simply stays
+  previous_status TEXT,                      -- captured when applied; restored at ends_at
+  state           TEXT        NOT NULL DEFAULT 'pending',
+  created_at      TIMESTAMPTZ NOT NULL DEFAULT now(),
+  CHECK (ends_at IS NULL OR ends_at > starts_at)
+);
+
+-- Scheduler claims: only rows still waiting for a transition are indexed
+CREATE INDEX IF NOT EXISTS idx_scheduled_statuses_due_start
+  ON scheduled_statuses (starts_at, id) WHERE state = 'pending';
+CREATE INDEX IF NOT EXISTS idx_scheduled_statuses_due_end
+  ON scheduled_statuses (ends_at, id) WHERE state = 'active';
+
+-- A user's own schedule (listing)
+CREATE INDEX IF NOT EXISTS idx_scheduled_statuses_user ON scheduled_statuses (user_id, starts_at);
+
+-- No two open ranges of one user may overlap (enforced here, not by the INSERT's NOT EXISTS,
+-- which two concurrent requests can both pass). Half-open [starts_at, ends_at); an open-ended
+-- entry only occupies its start. Violations are SQLSTATE 23P01 -> 409 in create_scheduled_status.
+-- Needs btree_gist (contrib) for the "user_id WITH =" part.
+CREATE EXTENSION IF NOT EXISTS btree_gist;
+
+DO $$
+BEGIN
+  IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'scheduled_statuses_no_overlap') THEN
+    ALTER TABLE scheduled_statuses ADD CONSTRAINT scheduled_statuses_no_overlap
+      EXCLUDE USING gist (
+        user_id WITH =,
+        tstzrange(starts_at, coalesce(ends_at, starts_at), CASE WHEN ends_at IS NULL THEN '[]' ELSE '[)' END) WITH &&
+      ) WHERE (state IN ('pending', 'active'));
+  END IF;
+END
+$$;
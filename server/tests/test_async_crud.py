@@ -0,0 +1,47 @@
+"""Native async CRUD (sql_db.db.async_variant): same results as the sync functions, no run_sync adapter."""
+from __future__ import annotations
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from server.crud import user_crud, user_status_crud
+from server.schemas.user_statuses_schema import Status, UserStatusCreate
+from server.scripts.bench_api import EMAIL_FMT
+from server.sql_db.db import run_db
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def adb(seeded, monkeypatch):
+    from server.sql_db.db import AsyncSessionLocal
+
+    async def no_run_sync(self, fn, *args, **kwargs):
+        raise AssertionError(f"{fn.__name__} went through run_sync")
+
+    async with AsyncSessionLocal() as session:
+        monkeypatch.setattr(AsyncSession, "run_sync", no_run_sync)
+        yield session
+
+
+async def test_reads_match_sync(adb, db):
+    email = EMAIL_FMT.format(4)
+    user = await run_db(adb, user_crud.get_user_by_email, email)
+    assert user.id == user_crud.get_user_by_email(db, email).id
+    assert await run_db(adb, user_crud.get_user_principal, user.id) == user_crud.get_user_principal(db, user.id)
+    assert await run_db(adb, user_crud.get_roster_version) == user_crud.get_roster_version(db)
+    after = user_crud.RosterCursor("Bench000010", "User", 0)
+    assert (await run_db(adb, user_crud.list_all_users_with_statuses, limit=5, after=after)
+            == user_crud.list_all_users_with_statuses(db, limit=5, after=after))
+
+
+async def test_status_writes(adb, db):
+    uid = user_crud.get_user_by_email(db, EMAIL_FMT.format(5)).id
+    db.commit()
+    await run_db(adb, user_status_crud.upsert_user_status, UserStatusCreate(user_id=uid, status=Status.working))
+
+    row = await run_db(adb, user_status_crud.update_user_status, uid, Status.on_vacation)
+    assert row.changed and row.status == Status.on_vacation.value
+    row = await run_db(adb, user_status_crud.upsert_user_status, UserStatusCreate(user_id=uid, status=Status.on_vacation))
+    assert not row.changed
+    assert user_crud.get_user_status_by_id(db, uid).status == Status.on_vacation.value
@@ -0,0 +1,44 @@
+"""Login throttling keyed on the client address (crud/rate_limit.py)."""
+from __future__ import annotations
+
+import httpx
+import pytest
+from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
+
+from server.crud import rate_limit
+from server.scripts.bench_api import EMAIL_FMT
+
+pytestmark = pytest.mark.anyio
+
+PROXY = "172.28.0.10"  # FORWARDED_ALLOW_IPS in docker-compose.yml
+BURST = 3
+
+
+@pytest.fixture
+def ip_limit(monkeypatch):
+    monkeypatch.setattr(rate_limit, "LOGIN_IP_LIMIT", rate_limit.Limit.per_minute(1, BURST))
+    monkeypatch.setattr(rate_limit, "store", rate_limit.InMemoryRateLimitStore())
+
+
+def _client(app, peer: str) -> httpx.AsyncClient:
+    # the app as uvicorn --proxy-headers serves it with the deployments' FORWARDED_ALLOW_IPS
+    transport = httpx.ASGITransport(app=ProxyHeadersMiddleware(app, trusted_hosts=PROXY), client=(peer, 40000))
+    return httpx.AsyncClient(transport=transport, base_url="http://login.local")
+
+
+async def _attempt(http: httpx.AsyncClient, forwarded_for: str) -> int:
+    r = await http.post("/auth/login", json={"email": EMAIL_FMT.format(2), "password": "nope-nope"},
+                        headers={"X-Forwarded-For": forwarded_for})
+    return r.status_code
+
+
+async def test_spoofed_forwarded_for_does_not_reset_ip_bucket(app, ip_limit):
+    async with _client(app, "203.0.113.7") as http:
+        codes = [await _attempt(http, f"198.51.100.{i}") for i in range(BURST + 1)]
+    assert codes == [401] * BURST + [429]
+
+
+async def test_forwarded_for_from_proxy_keys_real_clients(app, ip_limit):
+    async with _client(app, PROXY) as http:
+        codes = [await _attempt(http, f"198.51.100.{i}") for i in range(BURST + 1)]
+    assert codes == [401] * (BURST + 1)
@@ -0,0 +1,27 @@
+"""Statement budgets per hot route (scenarios in scripts/check_query_budgets.py)."""
+from __future__ import annotations
+
+import httpx
+import pytest
+
+from server.scripts.check_query_budgets import BUDGETS, Budget, new_ctx
+from server.sql_db import query_counter
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture(scope="module")
+async def ctx(app):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://budget.local") as http, \
+            httpx.AsyncClient(transport=transport, base_url="http://budget.local") as anon:
+        yield await new_ctx(http, anon)
+
+
+@pytest.mark.parametrize("budget", BUDGETS, ids=lambda b: b.name)
+async def test_query_budget(ctx, budget: Budget):
+    if budget.setup:
+        await budget.setup(ctx)
+    with query_counter.assert_max_queries(budget.max_queries, budget.name):
+        resp = await budget.call(ctx)
+    assert resp.status_code == budget.expected_status
@@ -0,0 +1,67 @@
+"""roster_read_model: same order and cursors as the DB roster, and other workers' status events applied."""
+from __future__ import annotations
+
+import pytest
+
+from server.crud import roster_read_model, status_events, user_crud
+from server.schemas.user_schema import UserCreate
+
+pytestmark = pytest.mark.anyio
+
+# orders differ between bytewise and most locale collations ("alice" < "Bob" in en_US)
+NAMES = [("alice", "x"), ("Bob", "y"), ("Émile", "z"), ("bob", "a"), ("Bob", "Y")]
+
+
+@pytest.fixture
+def odd_names(db):
+    ids = [
+        user_crud.create_user(
+            db, UserCreate(email=f"collation{i}@example.com", password="x" * 60, first_name=f, last_name=l)
+        ).id
+        for i, (f, l) in enumerate(NAMES)
+    ]
+    yield ids
+    for uid in ids:
+        user_crud.delete_user(db, uid)
+
+
+@pytest.fixture
+def model(db, monkeypatch):
+    m = roster_read_model.RosterReadModel()
+    m.load(user_crud.list_all_users_with_statuses(db), user_crud.get_roster_version(db))
+    monkeypatch.setattr(roster_read_model, "model", m)
+    return m
+
+
+def _walk(fetch, limit):
+    rows, after = [], None
+    while True:
+        page = fetch(limit=limit, after=after)
+        rows += page
+        if len(page) < limit:
+            return rows
+        last = page[-1]
+        after = user_crud.RosterCursor(last.first_name, last.last_name, last.id)
+
+
+async def test_order_and_cursors_match_db(db, odd_names, model):
+    from_db = user_crud.list_all_users_with_statuses(db)
+    assert model.page() == from_db
+    # a cursor from one path continues correctly on the other
+    assert _walk(lambda **kw: user_crud.list_all_users_with_statuses(db, **kw), 7) == from_db
+    assert _walk(model.page, 7) == from_db
+    mixed = iter([model.page, lambda **kw: user_crud.list_all_users_with_statuses(db, **kw)] * 1000)
+    assert _walk(lambda **kw: next(mixed)(**kw), 7) == from_db
+
+
+async def test_status_events_patch_the_model(db, model, monkeypatch):
+    requested = []
+    monkeypatch.setattr(roster_read_model, "_request_reconcile", lambda: requested.append(True))
+    uid = model.page(limit=1)[0].id
+
+    roster_read_model._on_status_event(status_events.StatusEvent(uid, "on_vacation"))
+    assert model.page(limit=1)[0].status == "on_vacation" and not requested
+
+    roster_read_model._on_status_event(status_events.StatusEvent(10**9, "working"))  # not in the snapshot
+    roster_read_model._on_status_event(None)  # listener lost events
+    assert requested == [True, True]
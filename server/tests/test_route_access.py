@@ -0,0 +1,80 @@
+"""Who may call the routes that expose more than the roster does."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+
+from server.routers import deps
+from server.scripts.bench_api import EMAIL_FMT, PASSWORD
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def http(app):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://access.local") as client:
+        r = await client.post("/auth/login", json={"email": EMAIL_FMT.format(1), "password": PASSWORD})
+        assert r.status_code == 200
+        client.user_id = r.json()["id"]
+        yield client
+
+
+@pytest.fixture
+def as_admin(http, monkeypatch):
+    monkeypatch.setattr(deps, "ADMIN_EMAILS", {EMAIL_FMT.format(1)})
+
+
+def _timeline(http, target_user_id: int):
+    now = datetime.now(timezone.utc)
+    return http.get("/user_statuses/status_timeline", params={
+        "user_id": http.user_id, "target_user_id": target_user_id,
+        "start": (now - timedelta(days=1)).isoformat(), "end": now.isoformat(),
+    })
+
+
+async def test_status_timeline_own(http):
+    r = await _timeline(http, http.user_id)
+    assert r.status_code == 200 and r.json()["user_id"] == http.user_id
+
+
+async def test_status_timeline_other_user_forbidden(http):
+    assert (await _timeline(http, http.user_id + 1)).status_code == 403
+
+
+async def test_status_timeline_other_user_as_admin(http, as_admin):
+    r = await _timeline(http, http.user_id + 1)
+    assert r.status_code == 200 and r.json()["user_id"] == http.user_id + 1
+
+
+async def test_status_timeline_user_id_must_be_caller(http, as_admin):
+    r = await http.get("/user_statuses/status_timeline", params={
+        "user_id": http.user_id + 1, "target_user_id": http.user_id + 1,
+        "start": "2025-01-01T00:00:00Z", "end": "2025-01-02T00:00:00Z",
+    })
+    assert r.status_code == 403
+
+
+@pytest.fixture
+def metrics_token(monkeypatch):
+    from server import metrics
+
+    monkeypatch.setattr(metrics, "METRICS_TOKEN", "scrape-secret")
+    return "scrape-secret"
+
+
+async def test_metrics_off_without_token_setting(http):
+    assert (await http.get("/metrics")).status_code == 404
+
+
+async def test_metrics_needs_bearer_token(http, metrics_token):
+    assert (await http.get("/metrics")).status_code == 401  # a session cookie is not enough
+    assert (await http.get("/metrics", headers={"Authorization": "Bearer nope"})).status_code == 401
+    r = await http.get("/metrics", headers={"Authorization": f"Bearer {metrics_token}"})
+    assert r.status_code == 200 and "http_request_duration_seconds" in r.text
+
+
+async def test_principal_cache_stats_route_is_gone(http):
+    # the counters are principal_cache_* series on /metrics, behind METRICS_TOKEN
+    assert (await http.get("/auth/principal_cache_stats")).status_code == 404
@@ -0,0 +1,107 @@
+"""Statements per status crud operation: each is one round-trip (RETURNING / CTE), whatever the batch size."""
+from __future__ import annotations
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+import pytest
+
+from server.crud import user_crud, user_status_crud, user_status_history_crud
+from server.schemas.user_statuses_schema import BulkOutcome, Status, UserStatusCreate
+from server.scripts.bench_api import EMAIL_FMT
+from server.sql_db.query_counter import assert_max_queries
+
+UNKNOWN_USER_ID = 10**12
+
+
+@pytest.fixture
+def user_ids(db) -> List[int]:
+    ids = [user_crud.get_user_by_email(db, EMAIL_FMT.format(i)).id for i in range(20)]
+    db.commit()
+    return ids
+
+
+def test_upsert_user_status(db, user_ids):
+    with assert_max_queries(1, "upsert_user_status"):
+        row = user_status_crud.upsert_user_status(db, UserStatusCreate(user_id=user_ids[0], status=Status.business_trip))
+    assert row.status == Status.business_trip.value
+
+    with assert_max_queries(1, "upsert_user_status unchanged"):
+        row = user_status_crud.upsert_user_status(db, UserStatusCreate(user_id=user_ids[0], status=Status.business_trip))
+    assert not row.changed
+
+
+def test_upsert_user_status_racing_insert(db, user_ids):
+    """A same-status insert committed while the upsert waits on it: the upsert reports that row."""
+    from server.models.user_status_model import UserStatus
+    from server.sql_db.db import SessionLocal
+
+    uid = user_ids[3]
+    user_status_crud.delete_user_status(db, uid)
+    other = SessionLocal()
+    try:
+        other.add(UserStatus(user_id=uid, status=Status.on_vacation.value))
+        other.flush()  # row inserted, not committed: the upsert below blocks on it
+        result = {}
+
+        def run_upsert():
+            result["row"] = user_status_crud.upsert_user_status(db, UserStatusCreate(user_id=uid, status=Status.on_vacation))
+
+        upsert = threading.Thread(target=run_upsert)
+        upsert.start()
+        upsert.join(0.5)
+        assert upsert.is_alive()
+        other.commit()
+        upsert.join(10)
+    finally:
+        other.close()
+    assert result["row"].status == Status.on_vacation.value and not result["row"].changed
+
+
+def test_update_user_status(db, user_ids):
+    user_status_crud.update_user_status(db, user_ids[1], Status.working)
+    with assert_max_queries(1, "update_user_status"):
+        row = user_status_crud.update_user_status(db, user_ids[1], Status.working_remotely)
+    assert row.changed and row.status == Status.working_remotely.value
+
+    with assert_max_queries(1, "update_user_status unknown user"):
+        assert user_status_crud.update_user_status(db, UNKNOWN_USER_ID, Status.working) is None
+
+
+@pytest.mark.parametrize("n", [1, 20])
+def test_bulk_upsert_user_statuses(db, user_ids, n):
+    items = [(uid, Status.on_vacation.value) for uid in user_ids[:n]] + [(UNKNOWN_USER_ID, Status.working.value)]
+    with assert_max_queries(1, f"bulk_upsert_user_statuses x{len(items)}"):
+        results = user_status_crud.bulk_upsert_user_statuses(db, items)
+    assert len(results) == len(items)
+    assert results[-1].outcome is BulkOutcome.user_not_found
+
+
+def test_bulk_update_user_statuses(db, user_ids):
+    items = [(uid, Status.working.value) for uid in user_ids]
+    with assert_max_queries(1, f"bulk_update_user_statuses x{len(items)}"):
+        results = user_status_crud.bulk_update_user_statuses(db, items)
+    assert set(results) == set(user_ids)
+
+
+def test_get_status_counts(db, seeded):
+    with assert_max_queries(1, "get_status_counts"):
+        counts = user_status_crud.get_status_counts(db)
+    assert set(counts) == {s.value for s in Status}
+    assert sum(counts.values()) >= seeded
+
+
+def test_history_reads(db, user_ids):
+    user_status_crud.update_user_status(db, user_ids[2], Status.working_remotely)
+    before = datetime.now(timezone.utc)
+    user_status_crud.update_user_status(db, user_ids[2], Status.business_trip)
+    user_status_crud.update_user_status(db, user_ids[2], Status.working)
+    after = datetime.now(timezone.utc) + timedelta(seconds=1)
+
+    with assert_max_queries(1, "get_user_status_timeline"):
+        timeline = user_status_history_crud.get_user_status_timeline(db, user_ids[2], before, after)
+    assert [h.status for h in timeline] == [Status.business_trip.value, Status.working.value]
+
+    with assert_max_queries(1, "list_users_with_statuses_at"):
+        rows = user_status_history_crud.list_users_with_statuses_at(db, before)
+    assert {r.id for r in rows} >= set(user_ids)
@@ -0,0 +1,50 @@
+"""status_events.stream(): a resync reaches a waiting subscriber at once, not with the next event."""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from server.crud import status_events
+from server.crud.status_events import StatusEvent
+
+pytestmark = pytest.mark.anyio
+
+RESYNC = "event: resync\ndata: {}\n\n"
+
+
+@pytest.fixture
+def hub(monkeypatch):
+    h = status_events.StatusEventHub()
+    monkeypatch.setattr(status_events, "hub", h)
+    return h
+
+
+async def _waiting_stream():
+    stream = status_events.stream(heartbeat_seconds=60)
+    assert await stream.__anext__() == "retry: 3000\n\n"
+    pending = asyncio.ensure_future(stream.__anext__())
+    await asyncio.sleep(0)  # parked on the empty queue
+    assert not pending.done()
+    return stream, pending
+
+
+async def test_resync_all_wakes_waiting_stream(hub):
+    stream, pending = await _waiting_stream()
+    hub.resync_all()
+    assert await asyncio.wait_for(pending, 1) == RESYNC
+    await stream.aclose()
+
+
+async def test_overflow_wakes_waiting_stream(hub, monkeypatch):
+    monkeypatch.setattr(status_events, "SUBSCRIBER_QUEUE_SIZE", 1)
+    stream, pending = await _waiting_stream()
+    hub._fanout(StatusEvent(1, "working"))
+    hub._fanout(StatusEvent(2, "working"))  # before the stream ran: the queue is full
+    assert await asyncio.wait_for(pending, 1) == RESYNC
+    nxt = asyncio.ensure_future(stream.__anext__())
+    await asyncio.sleep(0.05)
+    assert not nxt.done()  # one resync, and the dropped events are not replayed after it
+    nxt.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await nxt